@@ -0,0 +1,220 @@
+"""
+Chain Arrays
+Memory-mapped strike matrix for the spread engine (steps 05, 05B, 05C)
+
+The step 05 DTE window of the chain store is kept a second time as fixed
+dtype NumPy files in data/chain_arrays/:
+
+    matrix.npy       float64, one contiguous array per column: strike, then
+                     PACK_FIELDS (bid, ask, has_greeks, |delta|, iv) for
+                     puts and for calls; transposed it is the
+                     spread_engine strike matrix
+    expirations.npy  offset table per expiration: ticker, expiration_date,
+                     dte and its [start, stop) rows in the matrix
+    tickers.npy      offset table per ticker: its expiration and row ranges
+    manifest.json    store file (mtime, size) and settings the arrays were
+                     built from
+
+Files are opened with np.memmap (np.load mmap_mode="r"), so a step reads
+only the pages of the tickers it touches and worker processes map the
+same file instead of receiving a copy. This module only needs NumPy, so
+opening the arrays does not pay for importing pandas / pyarrow; the
+arrays are rebuilt from the store (chain_store.build_arrays) whenever the
+manifest no longer matches it.
+"""
+import json
+import os
+
+import numpy as np
+
+from spread_engine import MAX_DTE, MIN_DTE, PACK_FIELDS, SIDES, MatrixFile
+
+STORE_PATH = "data/chains.parquet"
+JSON_FILES = ("chains_with_greeks.json", "chains.json")
+
+ARRAYS_DIR = "chain_arrays"
+
+COLUMNS = ["strike"] + [f"{side}_{field}" for side, _, _ in SIDES for field in PACK_FIELDS]
+
+
+def newer_json(path=STORE_PATH):
+    """Legacy JSON snapshot (next to the store) to read instead of it, if any"""
+    store_time = os.path.getmtime(path) if os.path.exists(path) else None
+    for name in JSON_FILES:
+        json_path = os.path.join(os.path.dirname(path), name)
+        if os.path.exists(json_path) and (store_time is None or os.path.getmtime(json_path) > store_time):
+            return json_path
+    return None
+
+
+def arrays_dir(path=STORE_PATH):
+    """Array directory next to a store file"""
+    return os.path.join(os.path.dirname(path), ARRAYS_DIR)
+
+
+def _source(path):
+    stat = os.stat(path)
+    return {"file": os.path.basename(path), "mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+
+def ticker_table(index):
+    """
+    Per-ticker offset table from the per-expiration one
+
+    Args:
+        index: Expiration offset table (ticker, expiration_date, dte, start, stop)
+
+    Returns:
+        ndarray: ticker, first / end expiration and first / end row
+    """
+    tickers = index["ticker"]
+    first = np.flatnonzero(np.r_[True, tickers[1:] != tickers[:-1]]) if len(index) else np.zeros(0, int)
+    end = np.r_[first[1:], len(index)].astype(np.int64)
+
+    table = np.zeros(len(first), dtype=[
+        ("ticker", tickers.dtype), ("exp_start", np.int64), ("exp_stop", np.int64),
+        ("start", np.int64), ("stop", np.int64)
+    ])
+    table["ticker"] = tickers[first]
+    table["exp_start"] = first
+    table["exp_stop"] = end
+    table["start"] = index["start"][first]
+    table["stop"] = index["stop"][end - 1]
+    return table
+
+
+def split_matrix(matrix, index, tickers=None, table=None):
+    """
+    Split one packed matrix into per-ticker matrices and layouts
+
+    Args:
+        matrix: Strike matrix for every ticker (rows as in index)
+        index: Expiration offset table
+        tickers: Only these tickers (None = all), kept in index order
+        table: Ticker offset table (default: built from index)
+
+    Returns:
+        tuple: (expirations, packed, offsets) - expirations maps ticker to
+            its list of {"expiration_date", "dte"}, packed maps ticker to
+            (matrix rows, layout) as spread_engine.pack_ticker() and
+            offsets maps ticker to its first row in matrix
+    """
+    wanted = None if tickers is None else set(tickers)
+    expirations, packed, offsets = {}, {}, {}
+
+    for row in ticker_table(index) if table is None else table:
+        name = str(row["ticker"])
+        if wanted is not None and name not in wanted:
+            continue
+
+        exps = index[row["exp_start"]:row["exp_stop"]]
+        base = int(row["start"])
+        expirations[name] = [
+            {"expiration_date": str(e["expiration_date"]), "dte": int(e["dte"])} for e in exps
+        ]
+        layout = [
+            (n, int(e["dte"]), int(e["start"]) - base, int(e["stop"]) - base) for n, e in enumerate(exps)
+        ]
+        packed[name] = (matrix[base:int(row["stop"])], layout)
+        offsets[name] = base
+
+    return expirations, packed, offsets
+
+
+def write_arrays(matrix, index, directory, source):
+    """
+    Write the memory-mapped layout for a packed matrix
+
+    Each file is replaced atomically and the manifest goes last, so readers
+    either see a complete, matching set or rebuild it.
+
+    Args:
+        matrix: Strike matrix (rows x COLUMNS)
+        index: Expiration offset table for matrix
+        directory: Output directory
+        source: Store file the matrix was packed from
+    """
+    os.makedirs(directory, exist_ok=True)
+    arrays = {
+        "matrix": np.ascontiguousarray(np.asarray(matrix, dtype=np.float64).T),
+        "expirations": index,
+        "tickers": ticker_table(index),
+    }
+    for name, array in arrays.items():
+        tmp_path = os.path.join(directory, f"{name}.{os.getpid()}.tmp.npy")
+        np.save(tmp_path, array)
+        os.replace(tmp_path, os.path.join(directory, f"{name}.npy"))
+
+    manifest = {
+        "source": _source(source), "min_dte": MIN_DTE, "max_dte": MAX_DTE,
+        "columns": COLUMNS, "rows": len(matrix)
+    }
+    tmp_path = os.path.join(directory, f"manifest.{os.getpid()}.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, os.path.join(directory, "manifest.json"))
+
+
+def open_arrays(directory, source, tickers=None):
+    """
+    Map the arrays if they were built from the current store
+
+    Args:
+        directory: Array directory
+        source: Store file they must match
+        tickers: Only these tickers (None = all)
+
+    Returns:
+        tuple: (expirations, packed, mapped) as split_matrix() plus a
+            spread_engine.MatrixFile, or None when missing or stale
+    """
+    try:
+        with open(os.path.join(directory, "manifest.json"), "r") as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+    expected = {"source": _source(source), "min_dte": MIN_DTE, "max_dte": MAX_DTE, "columns": COLUMNS}
+    if any(manifest.get(key) != value for key, value in expected.items()):
+        return None
+
+    if manifest["rows"] == 0:
+        return {}, {}, None
+
+    matrix_path = os.path.join(directory, "matrix.npy")
+    matrix = np.load(matrix_path, mmap_mode="r").T
+    index, table = (np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r")
+                    for name in ("expirations", "tickers"))
+    expirations, packed, offsets = split_matrix(matrix, index, tickers, table)
+    return expirations, packed, MatrixFile(matrix_path, matrix, offsets)
+
+
+def load_arrays(tickers=None, path=STORE_PATH):
+    """
+    Spread engine input for steps 05-05C, memory-mapped when possible
+
+    Opens the arrays next to the store, rebuilding them first if the store
+    changed. When a legacy JSON snapshot is newer than the store, it is
+    packed in memory instead (nothing is mapped).
+
+    Args:
+        tickers: Tickers to load (None = all)
+        path: Store file
+
+    Returns:
+        tuple: (expirations, packed, mapped) - mapped is the MatrixFile to
+            hand to spread_engine.all_spreads(), or None
+    """
+    if newer_json(path) is None and os.path.exists(path):
+        directory = arrays_dir(path)
+        opened = open_arrays(directory, path, tickers)
+        if opened is None:
+            from chain_store import build_arrays
+            build_arrays(path)
+            opened = open_arrays(directory, path, tickers)
+        if opened is not None:
+            return opened
+
+    from chain_store import load_packed
+    expirations, packed = load_packed(tickers, path)
+    return expirations, packed, None
@@ -0,0 +1,293 @@
+"""
+Option Chain Cache
+Persistent TTL cache of Schwab option chain responses, shared across
+pipeline steps and back-to-back runs
+"""
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import date, datetime
+from enum import Enum
+from dotenv import load_dotenv
+
+load_dotenv()
+
+CACHE_DIR = os.getenv("CHAIN_CACHE_DIR", "data/cache/chains")
+
+# Seconds a cached chain stays fresh (0 disables cache reads)
+MAX_AGE = float(os.getenv("CHAIN_CACHE_MAX_AGE", "900"))
+
+# Entries never outlive their time bucket (default: one day)
+BUCKET_SECONDS = int(os.getenv("CHAIN_CACHE_BUCKET", "86400"))
+
+# Disk budget; least recently used entries are evicted beyond it
+MAX_BYTES = int(float(os.getenv("CHAIN_CACHE_MAX_MB", "500")) * 1024 * 1024)
+
+# Spot-aware refresh: a chain cached at a known underlying price is reused
+# until the underlying moves more than REFRESH_MOVE_PCT percent or the
+# entry is older than REFRESH_MAX_AGE seconds
+REFRESH_MOVE_PCT = float(os.getenv("CHAIN_REFRESH_MOVE_PCT", "0.5"))
+REFRESH_MAX_AGE = float(os.getenv("CHAIN_REFRESH_MAX_AGE", "1800"))
+
+
+def _normalize(value):
+    """Convert request parameter values into JSON-stable form"""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def all_strikes(params):
+    """
+    All-strikes variant of a strike_count request, or None
+
+    Steps 00C/00D request every strike while 02/04 ask for a strike_count
+    around the spot; the all-strikes response is a superset, so 02/04 can
+    be served from it. The string "ALL" hashes like StrikeRange.ALL.
+    """
+    if params.get("strike_count") is None:
+        return None
+    wider = {k: v for k, v in params.items() if k != "strike_count"}
+    wider["strike_range"] = "ALL"
+    return wider
+
+
+def cache_key(ticker, params, bucket=0):
+    """
+    Build cache key from ticker, request parameters and time bucket
+
+    Args:
+        ticker: Underlying symbol
+        params: Keyword arguments passed to client.get_option_chain
+        bucket: Time bucket number the entry belongs to
+
+    Returns:
+        str: Hex digest identifying the request
+    """
+    request = {
+        "ticker": ticker,
+        "params": {k: _normalize(v) for k, v in params.items() if v is not None},
+        "bucket": bucket
+    }
+    encoded = json.dumps(request, sort_keys=True).encode()
+    return hashlib.sha1(encoded).hexdigest()
+
+
+class ChainCache:
+    """
+    Two-level cache for raw option chain responses
+
+    Responses are kept gzip-compressed in process memory and on disk, so
+    later pipeline steps (separate processes) and reruns can reuse a chain
+    while it is younger than max_age and still in the current time bucket.
+    The disk store is bounded to max_bytes by evicting the least recently
+    used entries (body file mtime is refreshed on every hit).
+
+    Entries stored with the underlying spot price follow the move-triggered
+    policy instead: when looked up with the current spot they are reused
+    while the move is within refresh_move_pct and the entry is younger
+    than refresh_max_age.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, max_age=MAX_AGE,
+                 bucket_seconds=BUCKET_SECONDS, max_bytes=MAX_BYTES,
+                 refresh_move_pct=REFRESH_MOVE_PCT, refresh_max_age=REFRESH_MAX_AGE):
+        self.cache_dir = cache_dir
+        self.max_age = max_age
+        self.bucket_seconds = bucket_seconds
+        self.max_bytes = max_bytes
+        self.refresh_move_pct = refresh_move_pct
+        self.refresh_max_age = refresh_max_age
+        self.hits = 0
+        self.misses = 0
+        self._memory = {}
+        self._disk_bytes = None
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _key(self, ticker, params, now=None):
+        bucket = int((now or time.time()) // self.bucket_seconds)
+        return cache_key(ticker, params, bucket)
+
+    def _paths(self, key):
+        base = os.path.join(self.cache_dir, key)
+        return base + ".json.gz", base + ".meta.json"
+
+    def _is_fresh(self, fetched_at, cached_spot=None, spot=None):
+        age = time.time() - fetched_at
+        if self.max_age > 0 and age <= self.max_age:
+            return True
+
+        # Quiet underlying: keep serving the cached chain a while longer
+        if spot is None or not cached_spot or self.refresh_max_age <= 0:
+            return False
+        move_pct = abs(spot - cached_spot) / cached_spot * 100
+        return age <= self.refresh_max_age and move_pct <= self.refresh_move_pct
+
+    def get(self, ticker, params, spot=None):
+        """
+        Look up a cached chain response
+
+        A strike_count request falls back to a fresh all-strikes entry for
+        the same expirations (see all_strikes()).
+
+        Args:
+            ticker: Underlying symbol
+            params: Request parameters
+            spot: Current underlying price, enabling move-triggered reuse
+
+        Returns:
+            bytes: Raw response body, or None if missing or stale
+        """
+        body = self._lookup(ticker, params, spot)
+        if body is None and all_strikes(params) is not None:
+            body = self._lookup(ticker, all_strikes(params), spot)
+        with self._lock:
+            if body is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return body
+
+    def _lookup(self, ticker, params, spot):
+        key = self._key(ticker, params)
+        body_path, meta_path = self._paths(key)
+
+        with self._lock:
+            entry = self._memory.get(key)
+        if entry and self._is_fresh(entry[0], entry[2], spot):
+            self._touch(body_path)
+            return gzip.decompress(entry[1])
+
+        try:
+            with open(meta_path, "r") as f:
+                meta = json.load(f)
+            if not self._is_fresh(meta["fetched_at"], meta.get("spot"), spot):
+                return None
+            with open(body_path, "rb") as f:
+                compressed = f.read()
+            self._touch(body_path)
+        except (FileNotFoundError, ValueError, KeyError):
+            return None
+
+        with self._lock:
+            self._memory[key] = (meta["fetched_at"], compressed, meta.get("spot"))
+        return gzip.decompress(compressed)
+
+    def put(self, ticker, params, body, spot=None):
+        """Store raw response body (and the spot it was fetched at) in memory and on disk"""
+        fetched_at = time.time()
+        key = self._key(ticker, params, fetched_at)
+        compressed = gzip.compress(body)
+
+        with self._lock:
+            self._memory[key] = (fetched_at, compressed, spot)
+
+        body_path, meta_path = self._paths(key)
+        meta = {
+            "ticker": ticker,
+            "params": {k: _normalize(v) for k, v in params.items() if v is not None},
+            "fetched_at": fetched_at,
+            "spot": spot
+        }
+
+        # Write to temp files first so concurrent readers never see partial data
+        for path, data, mode in ((body_path, compressed, "wb"),
+                                 (meta_path, json.dumps(meta), "w")):
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, mode) as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+
+        self._track_disk_usage(len(compressed))
+
+    def _touch(self, body_path):
+        """Mark an entry as recently used for LRU eviction"""
+        try:
+            os.utime(body_path)
+        except FileNotFoundError:
+            pass
+
+    def _track_disk_usage(self, added):
+        """Evict least recently used entries once the disk budget is exceeded"""
+        with self._lock:
+            if self._disk_bytes is None:
+                self._disk_bytes = sum(size for _, size, _ in self._disk_entries())
+            else:
+                self._disk_bytes += added
+
+            if self._disk_bytes <= self.max_bytes:
+                return
+
+            # Evict down to 90% so we don't rescan on every put
+            target = self.max_bytes * 0.9
+            entries = sorted(self._disk_entries())
+            self._disk_bytes = sum(size for _, size, _ in entries)
+
+            for _, size, key in entries:
+                if self._disk_bytes <= target:
+                    break
+                for path in self._paths(key):
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:
+                        pass
+                self._memory.pop(key, None)
+                self._disk_bytes -= size
+
+    def _disk_entries(self):
+        """List (last_used, size, key) for every cached body on disk"""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".json.gz"):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.cache_dir, name))
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name[:-len(".json.gz")]))
+        return entries
+
+
+_default_cache = None
+
+
+def get_chain_cache():
+    """Return the process-wide chain cache"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ChainCache()
+    return _default_cache
+
+
+def fetch_option_chain(client, ticker, cache=None, parse=json.loads, spot=None, **params):
+    """
+    Get option chain JSON, served from cache while fresh
+
+    Args:
+        client: Authenticated Schwab client
+        ticker: Underlying symbol
+        cache: ChainCache to use (defaults to process-wide cache)
+        parse: Callable turning the raw response body into the result
+        spot: Current underlying price; cached chains are reused until it
+            moves past the refresh threshold
+        **params: Keyword arguments for client.get_option_chain
+
+    Returns:
+        dict: Parsed option chain response
+    """
+    cache = cache or get_chain_cache()
+
+    body = cache.get(ticker, params, spot)
+    if body is None:
+        response = client.get_option_chain(ticker, **params)
+        response.raise_for_status()
+        body = response.content
+        cache.put(ticker, params, body, spot)
+
+    return parse(body)
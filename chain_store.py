@@ -0,0 +1,362 @@
+"""
+Chain Store
+Columnar option chain snapshot shared by steps 02-05
+
+One row per contract (ticker, expiration, dte, strike, put/call, symbol,
+bid, ask, Greeks, IV) in data/chains.parquet, replacing chains.json and
+chains_with_greeks.json. Rows are sorted by ticker, DTE and strike, so
+reads filtered on ticker or DTE skip whole row groups and never parse
+the rest of the file. The pipeline's ticker order is kept in the file
+metadata.
+
+Steps that still write the nested JSON layout (the TastyTrade variants)
+keep working: readers fall back to the JSON files when they are newer
+than the store, and export_json() writes the old files on request.
+
+Every write also refreshes the memory-mapped copy of the step 05 DTE
+window that the spread steps open (see chain_arrays.py).
+"""
+import json
+import os
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from chain_arrays import STORE_PATH, arrays_dir, newer_json, split_matrix, write_arrays
+from spread_engine import MAX_DTE, MIN_DTE, PACK_FIELDS, SIDES
+
+GREEK_FIELDS = ("delta", "gamma", "theta", "vega", "rho", "iv")
+COLUMNS = (
+    "ticker", "expiration_date", "dte", "strike", "put_call", "symbol", "bid", "ask", "has_greeks"
+) + GREEK_FIELDS
+
+# Contract side <-> put_call code; calls first, matching strike record key order.
+# A strike listed without either contract keeps one row with put_call "".
+SIDE_CODES = (("call", "C"), ("put", "P"))
+NO_CONTRACT = ""
+SORT_KEYS = ["ticker", "dte", "expiration_date", "strike", "put_call"]
+
+ROW_GROUP_ROWS = 50_000
+
+
+def chains_to_frame(chains):
+    """
+    Flatten nested chains (chains.json / chains_with_greeks.json layout)
+
+    Args:
+        chains: Ticker to expiration list
+
+    Returns:
+        DataFrame: One row per contract, in chains order
+    """
+    columns = {name: [] for name in COLUMNS}
+    missing = (False,) + (np.nan,) * len(GREEK_FIELDS)
+
+    for ticker, expirations in chains.items():
+        for exp_data in expirations:
+            for strike in exp_data["strikes"]:
+                sides = [
+                    (side, code) for side, code in SIDE_CODES
+                    if f"{side}_bid" in strike or f"{side}_symbol" in strike
+                ]
+                for side, code in sides or [("", NO_CONTRACT)]:
+                    greeks = strike.get(f"{side}_greeks")
+                    row = (
+                        ticker, exp_data["expiration_date"], exp_data["dte"], strike["strike"], code,
+                        strike.get(f"{side}_symbol", ""), strike.get(f"{side}_bid", 0),
+                        strike.get(f"{side}_ask", 0)
+                    )
+                    row += (True,) + tuple(greeks.get(f, 0) for f in GREEK_FIELDS) if greeks else missing
+                    for name, value in zip(COLUMNS, row):
+                        columns[name].append(value)
+
+    frame = pd.DataFrame(columns)
+    return frame.astype({
+        "dte": np.int32, "strike": float, "bid": float, "ask": float, "has_greeks": bool,
+        **{f: float for f in GREEK_FIELDS}
+    })
+
+
+def frame_to_chains(frame, with_greeks=True):
+    """
+    Rebuild nested chains from a store frame
+
+    Args:
+        frame: Store rows in read_store() order
+        with_greeks: Embed call_greeks / put_greeks (chains_with_greeks.json layout)
+
+    Returns:
+        dict: Ticker to expiration list, strike records as written by step 02
+    """
+    chains = {}
+    sides = dict((code, side) for side, code in SIDE_CODES)
+
+    for row in frame.itertuples(index=False):
+        expirations = chains.setdefault(row.ticker, [])
+        if not expirations or expirations[-1]["expiration_date"] != row.expiration_date:
+            expirations.append({"expiration_date": row.expiration_date, "dte": int(row.dte), "strikes": []})
+
+        strikes = expirations[-1]["strikes"]
+        if not strikes or strikes[-1]["strike"] != row.strike:
+            strikes.append({"strike": float(row.strike)})
+
+        if row.put_call == NO_CONTRACT:
+            continue
+
+        side = sides[row.put_call]
+        record = strikes[-1]
+        record[f"{side}_symbol"] = row.symbol
+        record[f"{side}_bid"] = float(row.bid)
+        record[f"{side}_ask"] = float(row.ask)
+        if with_greeks and row.has_greeks:
+            record[f"{side}_greeks"] = {f: float(getattr(row, f)) for f in GREEK_FIELDS}
+
+    return chains
+
+
+def write_store(frame, path=STORE_PATH, tickers=None):
+    """
+    Write a contract frame to the Parquet store
+
+    Args:
+        frame: Contract rows (chains_to_frame output)
+        path: Store file
+        tickers: Pipeline ticker order (default: order of first appearance)
+    """
+    if tickers is None:
+        tickers = list(dict.fromkeys(frame["ticker"]))
+
+    frame = frame.sort_values(SORT_KEYS, kind="stable").reset_index(drop=True)
+    table = pa.Table.from_pandas(frame[list(COLUMNS)], preserve_index=False)
+
+    meta = {"timestamp": datetime.now().isoformat(), "tickers": list(tickers)}
+    table = table.replace_schema_metadata({
+        **(table.schema.metadata or {}), b"chain_store": json.dumps(meta).encode()
+    })
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    pq.write_table(table, tmp_path, row_group_size=ROW_GROUP_ROWS, compression="zstd")
+    os.replace(tmp_path, path)
+
+    build_arrays(path)
+
+
+def store_metadata(path=STORE_PATH):
+    """Timestamp and ticker order recorded with the store"""
+    metadata = pq.read_schema(path).metadata or {}
+    return json.loads(metadata.get(b"chain_store", b"{}"))
+
+
+def read_store(path=STORE_PATH, tickers=None, min_dte=None, max_dte=None, columns=None):
+    """
+    Read contracts, filtering on ticker and DTE inside the Parquet scan
+
+    Args:
+        path: Store file
+        tickers: Only these tickers (None = all)
+        min_dte: Only expirations with dte >= this
+        max_dte: Only expirations with dte <= this
+        columns: Columns to load besides the sort keys (None = all)
+
+    Returns:
+        DataFrame: Matching contracts in pipeline ticker order, then DTE,
+            strike and put/call
+    """
+    if columns is not None:
+        columns = list(dict.fromkeys(SORT_KEYS + list(columns)))
+
+    json_path = newer_json(path)
+    if json_path is not None:
+        with open(json_path, "r") as f:
+            data = json.load(f)
+        frame = chains_to_frame(data.get("chains_with_greeks") or data.get("chains") or {})
+        order = list(dict.fromkeys(frame["ticker"]))
+
+        keep = np.ones(len(frame), dtype=bool)
+        if tickers is not None:
+            keep &= frame["ticker"].isin(list(tickers)).to_numpy()
+        if min_dte is not None:
+            keep &= (frame["dte"] >= min_dte).to_numpy()
+        if max_dte is not None:
+            keep &= (frame["dte"] <= max_dte).to_numpy()
+        frame = frame[keep].sort_values(SORT_KEYS, kind="stable")
+        if columns is not None:
+            frame = frame[columns]
+    else:
+        filters = []
+        if tickers is not None:
+            filters.append(("ticker", "in", list(tickers)))
+        if min_dte is not None:
+            filters.append(("dte", ">=", min_dte))
+        if max_dte is not None:
+            filters.append(("dte", "<=", max_dte))
+
+        frame = pq.read_table(path, columns=columns, filters=filters or None).to_pandas()
+        order = store_metadata(path).get("tickers", [])
+
+    # Rows are in SORT_KEYS order; restore pipeline ticker order on top
+    rank = {ticker: n for n, ticker in enumerate(order)}
+    position = frame["ticker"].map(rank).fillna(len(rank)).to_numpy()
+    return frame.iloc[np.argsort(position, kind="stable")].reset_index(drop=True)
+
+
+def load_chains(path=STORE_PATH, with_greeks=True, **filters):
+    """Nested chains (old JSON layout) from the store; filters as in read_store()"""
+    return frame_to_chains(read_store(path, **filters), with_greeks)
+
+
+def export_json(frame, data_dir="data"):
+    """
+    Write chains.json and, if any contract has Greeks, chains_with_greeks.json
+
+    Call it before write_store(): readers only use the JSON files when they
+    are newer than the store.
+
+    Args:
+        frame: Store rows (chains_to_frame() or read_store())
+        data_dir: Output directory
+
+    Returns:
+        list: Paths written
+    """
+    timestamp = datetime.now().isoformat()
+    plain = frame_to_chains(frame, with_greeks=False)
+    outputs = {"chains.json": {"timestamp": timestamp, "total_tickers": len(plain), "chains": plain}}
+
+    if frame["has_greeks"].any():
+        chains = frame_to_chains(frame, with_greeks=True)
+        outputs["chains_with_greeks.json"] = {
+            "timestamp": timestamp, "total_tickers": len(chains), "chains_with_greeks": chains
+        }
+
+    paths = []
+    for name, output in outputs.items():
+        path = os.path.join(data_dir, name)
+        with open(path, "w") as f:
+            json.dump(output, f, indent=2)
+        paths.append(path)
+    return paths
+
+
+def strike_rows(frame):
+    """
+    Group store rows into strike records
+
+    Args:
+        frame: Store rows in read_store() order
+
+    Returns:
+        tuple: (row, new_ticker, new_expiration) - strike record number of
+            each contract and masks of the rows starting a ticker / expiration
+    """
+    ticker = frame["ticker"].to_numpy()
+    expiration = frame["expiration_date"].to_numpy()
+    strike = frame["strike"].to_numpy()
+
+    new_ticker = np.r_[True, ticker[1:] != ticker[:-1]]
+    new_expiration = new_ticker | np.r_[True, expiration[1:] != expiration[:-1]]
+    row = np.cumsum(new_expiration | np.r_[True, strike[1:] != strike[:-1]]) - 1
+    return row, new_ticker, new_expiration
+
+
+def pack_matrix(frame):
+    """
+    Pack store rows into one spread_engine strike matrix without building dicts
+
+    Same rows as spread_engine.pack_ticker() for the same contracts, every
+    ticker stacked in frame order; filter the frame to the DTE window first
+    (read_store min_dte/max_dte).
+
+    Args:
+        frame: Store rows in read_store() order
+
+    Returns:
+        tuple: (matrix, index) - index is the per-expiration offset table
+            (ticker, expiration_date, dte, start, stop rows)
+    """
+    width = 1 + len(SIDES) * len(PACK_FIELDS)
+    if len(frame) == 0:
+        index = np.zeros(0, dtype=[("ticker", "U1"), ("expiration_date", "U10"), ("dte", np.int32),
+                                   ("start", np.int64), ("stop", np.int64)])
+        return np.zeros((0, width)), index
+
+    row, _, new_expiration = strike_rows(frame)
+
+    matrix = np.zeros((row[-1] + 1, width))
+    matrix[row, 0] = frame["strike"].to_numpy()
+
+    has = frame["has_greeks"].to_numpy()
+    values = {
+        "bid": frame["bid"].to_numpy(),
+        "ask": frame["ask"].to_numpy(),
+        "has_greeks": has,
+        "delta": np.where(has, np.abs(frame["delta"].to_numpy()), 0.0),
+        "iv": np.where(has, frame["iv"].to_numpy(), 0.0),
+    }
+    codes = dict(SIDE_CODES)
+    put_call = frame["put_call"].to_numpy()
+
+    for side_no, (side, _, _) in enumerate(SIDES):
+        sel = put_call == codes[side]
+        for k, field in enumerate(PACK_FIELDS):
+            matrix[row[sel], 1 + side_no * len(PACK_FIELDS) + k] = values[field][sel]
+
+    # One offset record per expiration
+    exp_rows = np.flatnonzero(new_expiration)
+    ticker = frame["ticker"].to_numpy()[exp_rows].astype(str)
+    expiration = frame["expiration_date"].to_numpy()[exp_rows].astype(str)
+
+    index = np.zeros(len(exp_rows), dtype=[
+        ("ticker", ticker.dtype), ("expiration_date", expiration.dtype), ("dte", np.int32),
+        ("start", np.int64), ("stop", np.int64)
+    ])
+    index["ticker"] = ticker
+    index["expiration_date"] = expiration
+    index["dte"] = frame["dte"].to_numpy()[exp_rows]
+    index["start"] = row[exp_rows]
+    index["stop"] = np.r_[row[exp_rows][1:], len(matrix)]
+    return matrix, index
+
+
+def pack_frame(frame):
+    """
+    Pack store rows into per-ticker spread_engine strike matrices
+
+    Args:
+        frame: Store rows in read_store() order, within the DTE window
+
+    Returns:
+        tuple: (expirations, packed) - expirations maps ticker to its list
+            of {"expiration_date", "dte"} (what the layout positions index)
+            and packed maps ticker to (matrix, layout)
+    """
+    expirations, packed, _ = split_matrix(*pack_matrix(frame))
+    return expirations, packed
+
+
+def build_arrays(path=STORE_PATH):
+    """Rebuild the memory-mapped step 05 window of a store (chain_arrays.py)"""
+    frame = read_store(path, min_dte=MIN_DTE, max_dte=MAX_DTE, columns=PACK_FIELDS)
+    write_arrays(*pack_matrix(frame), directory=arrays_dir(path), source=path)
+
+
+def load_packed(tickers=None, path=STORE_PATH):
+    """
+    Spread engine input straight from the store
+
+    Only the step 05 DTE window, the given tickers and the packed columns
+    are read from disk.
+
+    Args:
+        tickers: Tickers to load (None = all)
+        path: Store file
+
+    Returns:
+        tuple: (expirations, packed) as returned by pack_frame()
+    """
+    frame = read_store(path, tickers=tickers, min_dte=MIN_DTE, max_dte=MAX_DTE, columns=PACK_FIELDS)
+    return pack_frame(frame)
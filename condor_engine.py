@@ -0,0 +1,169 @@
+"""
+Iron Condor Engine
+Builds iron condors by joining Bull Put and Bear Call candidates on
+ticker and expiration
+
+An iron condor is a Bull Put plus a Bear Call on the same expiration with
+the short put below the short call. It keeps the combined credit, risks
+the wider wing less that credit, and profits while the underlying
+finishes between the short strikes.
+"""
+import numpy as np
+
+from spread_records import CONDOR_DTYPE, SPREAD_TYPES, CondorTable, py_round
+
+# Condor filters
+MIN_CONDOR_POP = 50
+MIN_CONDOR_ROI = 10
+MAX_CONDOR_ROI = 100
+
+# Best condors kept per ticker and expiration (None keeps all - can be
+# tens of millions on a full universe)
+CONDORS_PER_EXPIRATION = 5
+
+BULL_PUT = SPREAD_TYPES.index("Bull Put")
+BEAR_CALL = SPREAD_TYPES.index("Bear Call")
+
+
+def vertical_index(table):
+    """
+    Group vertical candidates by ticker and expiration
+
+    Args:
+        table: SpreadTable of Bull Put / Bear Call candidates
+
+    Returns:
+        list: (ticker code, expiration code, put rows, call rows) per group
+            holding at least one of each, rows in table order
+    """
+    records = table.records
+    if len(records) == 0:
+        return []
+
+    # Stable: rows keep table order inside each (ticker, expiration, type)
+    order = np.lexsort((records["type"], records["expiration"], records["ticker"]))
+    tickers = records["ticker"][order]
+    expirations = records["expiration"][order]
+    types = records["type"][order]
+
+    change = (tickers[1:] != tickers[:-1]) | (expirations[1:] != expirations[:-1])
+    bounds = np.r_[0, np.flatnonzero(change) + 1, len(order)]
+
+    groups = []
+    for start, stop in zip(bounds[:-1], bounds[1:]):
+        split = start + np.searchsorted(types[start:stop], BEAR_CALL)
+        puts = order[start:split][types[start:split] == BULL_PUT]
+        calls = order[split:stop]
+        if len(puts) and len(calls):
+            groups.append((int(tickers[start]), int(expirations[start]), puts, calls))
+    return groups
+
+
+def join_condors(records, puts, calls, min_pop=MIN_CONDOR_POP, min_roi=MIN_CONDOR_ROI,
+                 max_roi=MAX_CONDOR_ROI, top_k=CONDORS_PER_EXPIRATION):
+    """
+    Pair one group's Bull Puts and Bear Calls into iron condors
+
+    Joint PoP is the chance of finishing between the short strikes,
+    put PoP + call PoP - 100. Calls are indexed by PoP, so each put only
+    pairs with the calls that can reach min_pop; the rest are never
+    generated.
+
+    Args:
+        records: Vertical records (SPREAD_DTYPE)
+        puts: Bull Put rows of the group
+        calls: Bear Call rows of the group
+        min_pop: Minimum joint PoP
+        min_roi: Minimum condor ROI
+        max_roi: Maximum condor ROI
+        top_k: Keep only the k best by score (None keeps all)
+
+    Returns:
+        ndarray: Condor records (CONDOR_DTYPE), best first when top_k is set
+    """
+    calls = calls[np.argsort(records["pop"][calls], kind="stable")]
+    call_pop = records["pop"][calls]
+
+    # First call (by PoP) each put can pair with
+    first = np.searchsorted(call_pop, min_pop + 100 - records["pop"][puts] - 1e-9)
+    counts = len(calls) - first
+    total = int(counts.sum())
+    if total == 0:
+        return np.zeros(0, CONDOR_DTYPE)
+
+    # Pair list as positions into puts / (PoP-sorted) calls
+    starts = np.cumsum(counts) - counts
+    put_pos = np.repeat(np.arange(len(puts)), counts)
+    call_pos = np.arange(total) + np.repeat(first - starts, counts)
+
+    # Work on contiguous per-group columns rather than full records
+    def column(rows, name):
+        return records[name][rows]
+
+    credit = column(puts, "net_credit")[put_pos] + column(calls, "net_credit")[call_pos]
+    width = np.maximum(column(puts, "width")[put_pos], column(calls, "width")[call_pos])
+    max_loss = width - credit
+    pop = column(puts, "pop")[put_pos] + call_pop[call_pos] - 100
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        roi = credit / max_loss * 100
+
+    keep = (
+        (column(puts, "short_strike")[put_pos] < column(calls, "short_strike")[call_pos])
+        & (max_loss > 0)
+        & (pop >= min_pop)
+        & (roi >= min_roi)
+        & (roi <= max_roi)
+    )
+
+    keep = np.flatnonzero(keep)
+    roi = py_round(roi[keep], 1)
+    pop = py_round(pop[keep], 1)
+
+    if top_k is not None and len(keep) > top_k:
+        # Same score as spread_scores(); ties keep pairing order
+        score = py_round(roi * pop / 100, 1)
+        best = np.lexsort((np.arange(len(keep)), -score))[:top_k]
+        keep, roi, pop = keep[best], roi[best], pop[best]
+
+    put = records[puts[put_pos[keep]]]
+    call = records[calls[call_pos[keep]]]
+
+    condors = np.zeros(len(keep), CONDOR_DTYPE)
+    condors["ticker"] = put["ticker"]
+    condors["expiration"] = put["expiration"]
+    condors["dte"] = put["dte"]
+    condors["stock_price"] = put["stock_price"]
+    condors["put_long"] = put["long_strike"]
+    condors["put_short"] = put["short_strike"]
+    condors["call_short"] = call["short_strike"]
+    condors["call_long"] = call["long_strike"]
+    condors["width"] = width[keep]
+    condors["net_credit"] = py_round(credit[keep], 2)
+    condors["max_loss"] = py_round(max_loss[keep], 2)
+    condors["roi"] = roi
+    condors["pop"] = pop
+    return condors
+
+
+def build_condors(table, min_pop=MIN_CONDOR_POP, min_roi=MIN_CONDOR_ROI,
+                  max_roi=MAX_CONDOR_ROI, top_k=CONDORS_PER_EXPIRATION):
+    """
+    Build all qualifying iron condors from vertical candidates
+
+    Args:
+        table: SpreadTable of Bull Put / Bear Call candidates (step 05)
+        min_pop: Minimum joint PoP
+        min_roi: Minimum condor ROI
+        max_roi: Maximum condor ROI
+        top_k: Condors kept per ticker and expiration (None keeps all)
+
+    Returns:
+        CondorTable: Condors grouped by ticker and expiration
+    """
+    parts = [
+        join_condors(table.records, puts, calls, min_pop, min_roi, max_roi, top_k)
+        for _, _, puts, calls in vertical_index(table)
+    ]
+    records = np.concatenate(parts) if parts else None
+    return CondorTable(records, table.tickers, table.dates)
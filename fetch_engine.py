@@ -0,0 +1,86 @@
+"""
+Concurrent Schwab Fetch Engine
+Runs per-ticker API requests in parallel with bounded concurrency
+"""
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+
+from schwab_client import get_schwab_client
+from chain_cache import fetch_option_chain
+
+load_dotenv()
+
+# Maximum requests in flight at once
+MAX_CONCURRENCY = int(os.getenv("SCHWAB_MAX_CONCURRENCY", "8"))
+
+
+class FetchEngine:
+    """
+    Thread pool wrapper around a shared Schwab client
+
+    Results are yielded in input order while later requests are still in
+    flight, so callers keep their existing sequential processing and
+    logging. Errors are captured per item instead of aborting the run.
+    """
+
+    def __init__(self, client=None, max_concurrency=MAX_CONCURRENCY):
+        self.client = client or get_schwab_client()
+        self.max_concurrency = max(1, max_concurrency)
+
+    def map(self, fetch, items):
+        """
+        Run fetch(client, item) for every item concurrently
+
+        Args:
+            fetch: Callable taking (client, item)
+            items: Iterable of work items (e.g. tickers)
+
+        Yields:
+            tuple: (item, result, error) in input order; error is the
+                exception raised for that item, or None
+        """
+        def run(item):
+            try:
+                return fetch(self.client, item), None
+            except Exception as e:
+                return None, e
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            # Bound submitted work so completed responses don't pile up in memory
+            pending = deque()
+            for item in items:
+                pending.append((item, executor.submit(run, item)))
+                if len(pending) >= self.max_concurrency * 2:
+                    item, future = pending.popleft()
+                    yield (item, *future.result())
+
+            while pending:
+                item, future = pending.popleft()
+                yield (item, *future.result())
+
+    def fetch_chains(self, tickers, plan=None, parser=None, spots=None, **params):
+        """
+        Fetch option chains for tickers concurrently
+
+        Args:
+            tickers: Iterable of underlying symbols
+            plan: Optional callable returning per-ticker request parameters
+            parser: Optional callable returning a per-ticker ChainParser
+            spots: Optional dict of current underlying prices, enabling
+                move-triggered reuse of cached chains
+            **params: Keyword arguments for client.get_option_chain
+
+        Yields:
+            tuple: (ticker, chain_data, error) in input order
+        """
+        def fetch(client, ticker):
+            request = plan(ticker) if plan else params
+            if parser:
+                request = {**request, "parse": parser(ticker).parse}
+            if spots:
+                request = {**request, "spot": spots.get(ticker)}
+            return fetch_option_chain(client, ticker, **request)
+
+        return self.map(fetch, tickers)
@@ -0,0 +1,194 @@
+"""
+Monte Carlo Spread Simulator
+Batched PoP-at-breakeven, probability of touch and expected P&L for every
+candidate spread
+
+The underlying follows risk-neutral GBM at the short leg's IV, monitored at
+daily closes. All spreads share one seeded matrix of daily normal draws
+(half of them antithetic), so results are reproducible and candidates of
+one ticker/expiration are compared on the same paths.
+
+Only the touch test needs whole paths, and only for paths passing close to
+a short strike. PoP and expected P&L depend on the terminal draw alone: it
+is sorted once per expiration and every spread is answered by binary
+search plus prefix sums.
+"""
+import math
+
+import numpy as np
+
+from spread_engine import RISK_FREE_RATE
+from spread_records import SPREAD_TYPES
+
+MC_PATHS = 10000
+MC_SEED = 7
+
+# Cap on path elements scanned at once by the touch test
+CHUNK_ELEMENTS = 4_000_000
+
+BEAR_CALL = SPREAD_TYPES.index("Bear Call")
+
+
+def brownian_paths(days, paths=MC_PATHS, seed=MC_SEED):
+    """
+    Shared standard Brownian paths sampled at daily closes
+
+    Args:
+        days: Longest horizon in days
+        paths: Number of paths (rounded up to even; second half antithetic)
+        seed: Generator seed
+
+    Returns:
+        ndarray: (paths, days) W at the end of day 1..days, in years
+    """
+    rng = np.random.default_rng(seed)
+    z = rng.standard_normal(((paths + 1) // 2, days))
+    z = np.concatenate([z, -z])
+    return np.cumsum(z, axis=1) * math.sqrt(1 / 365.0)
+
+
+def touch_probs(w, stock_price, strikes, ivs, is_call):
+    """
+    Chance the underlying closes at or beyond each strike before expiration
+
+    The log price is mu*t + sigma*W(t). Its extreme lies within |mu|*T of
+    sigma times W's own extreme, so most paths are decided from W's
+    extreme alone; only paths near the barrier are scanned in full.
+
+    Args:
+        w: (paths, dte) Brownian paths up to expiration
+        stock_price: Underlying price
+        strikes: Short strikes
+        ivs: Fractional IV per strike
+        is_call: True to test upward touches
+
+    Returns:
+        ndarray: Touch probability in percent per strike
+    """
+    paths, dte = w.shape
+    t = np.arange(1, dte + 1) / 365.0
+
+    # Work on -W for calls so a touch is always the minimum reaching the barrier
+    sign = -1.0 if is_call else 1.0
+    at = np.argmin(sign * w, axis=1)
+    extreme = sign * w[np.arange(paths), at]
+
+    sigma = ivs[:, None]
+    mu = sign * (RISK_FREE_RATE - 0.5 * ivs ** 2)[:, None]
+    barrier = sign * np.log(strikes / stock_price)[:, None]
+
+    base = sigma * extreme
+    sure = base + mu * t[at] <= barrier                      # reached at W's extreme
+    maybe = ~sure & (base + np.minimum(mu, 0) * t[-1] <= barrier)
+
+    hits = sure.sum(axis=1)
+    legs, rows = np.nonzero(maybe)
+    step = max(1, CHUNK_ELEMENTS // dte)
+    for lo in range(0, len(legs), step):
+        leg, row = legs[lo:lo + step], rows[lo:lo + step]
+        log_paths = mu[leg] * t + sigma[leg] * sign * w[row]
+        hit = log_paths.min(axis=1) <= barrier[leg, 0]
+        hits += np.bincount(leg[hit], minlength=len(strikes))
+
+    return hits / paths * 100
+
+
+def terminal_stats(w_sorted, stock_price, dte, iv, short_strike, long_strike,
+                   net_credit, is_call):
+    """
+    PoP at breakeven and expected P&L from sorted terminal draws
+
+    Args:
+        w_sorted: Sorted terminal Brownian values W(T)
+        stock_price: Underlying price
+        dte: Days to expiration
+        iv: Fractional short-leg IV shared by all spreads passed
+        short_strike, long_strike, net_credit: Arrays, one entry per spread
+        is_call: True for Bear Calls, False for Bull Puts
+
+    Returns:
+        tuple: (PoP in percent, expected P&L per share) arrays
+    """
+    T = dte / 365.0
+    n = len(w_sorted)
+    forward = stock_price * math.exp((RISK_FREE_RATE - 0.5 * iv ** 2) * T)
+    prices = forward * np.exp(iv * w_sorted)
+    below = np.r_[0.0, np.cumsum(prices)]
+
+    def w_at(price):
+        return np.log(price / forward) / iv
+
+    def payoff(strike):
+        # Mean of the option payoff over the sorted terminal prices
+        k = np.searchsorted(w_sorted, w_at(strike))
+        if is_call:
+            return ((below[n] - below[k]) - (n - k) * strike) / n
+        return (k * strike - below[k]) / n
+
+    if is_call:
+        breakeven = short_strike + net_credit
+        pop = np.searchsorted(w_sorted, w_at(breakeven), side="left") / n
+    else:
+        breakeven = short_strike - net_credit
+        pop = 1 - np.searchsorted(w_sorted, w_at(breakeven), side="right") / n
+
+    expected_pnl = net_credit - payoff(short_strike) + payoff(long_strike)
+    return pop * 100, expected_pnl
+
+
+def simulate_spreads(table, paths=MC_PATHS, seed=MC_SEED):
+    """
+    Fill mc_pop, touch_prob and expected_pnl for every spread in a table
+
+    Args:
+        table: SpreadTable of Bull Put / Bear Call spreads (updated in place)
+        paths: Simulated paths shared by all spreads
+        seed: Generator seed
+
+    Returns:
+        SpreadTable: The same table
+    """
+    records = table.records
+    simulate = np.flatnonzero((records["dte"] > 0) & (records["short_iv"] > 0))
+    if len(simulate) == 0:
+        return table
+
+    w = brownian_paths(int(records["dte"][simulate].max()), paths, seed)
+
+    # One group per ticker, expiration and spread type
+    order = simulate[np.lexsort((
+        records["short_strike"][simulate], records["type"][simulate],
+        records["expiration"][simulate], records["ticker"][simulate]
+    ))]
+    keys = np.stack([records[f][order] for f in ("ticker", "expiration", "type")])
+    change = np.any(keys[:, 1:] != keys[:, :-1], axis=0)
+    bounds = np.r_[0, np.flatnonzero(change) + 1, len(order)]
+
+    for start, stop in zip(bounds[:-1], bounds[1:]):
+        rows = order[start:stop]
+        first = records[rows[0]]
+        dte = int(first["dte"])
+        is_call = first["type"] == BEAR_CALL
+        stock_price = float(first["stock_price"])
+
+        group_w = w[:, :dte]
+        w_sorted = np.sort(group_w[:, -1])
+
+        # Distinct short legs (rows are sorted by short strike)
+        shorts, leg = np.unique(records["short_strike"][rows], return_inverse=True)
+        leg_iv = np.zeros(len(shorts))
+        leg_iv[leg] = records["short_iv"][rows] / 100
+
+        records["touch_prob"][rows] = np.round(
+            touch_probs(group_w, stock_price, shorts, leg_iv, is_call)[leg], 1)
+
+        for n, iv in enumerate(leg_iv):
+            leg_rows = rows[leg == n]
+            pop, pnl = terminal_stats(
+                w_sorted, stock_price, dte, iv, records["short_strike"][leg_rows],
+                records["long_strike"][leg_rows], records["net_credit"][leg_rows], is_call
+            )
+            records["mc_pop"][leg_rows] = np.round(pop, 1)
+            records["expected_pnl"][leg_rows] = np.round(pnl, 3)
+
+    return table
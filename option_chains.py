@@ -0,0 +1,239 @@
+"""
+Option Chain Helpers
+Plans Schwab chain requests and converts responses into the pipeline's
+strike records
+"""
+import json
+import math
+import re
+from datetime import timedelta
+from schwab.client import Client
+
+
+# Filters used by step 02: 0-45 DTE, 70-130% of stock price
+MIN_DTE = 0
+MAX_DTE = 45
+MIN_STRIKE_PCT = 0.70
+MAX_STRIKE_PCT = 1.30
+
+# Contract fields read by the pipeline; everything else is dropped while parsing
+CONTRACT_FIELDS = ('symbol', 'bid', 'ask', 'delta', 'gamma', 'theta', 'vega', 'rho', 'volatility')
+
+# Expiration map keys look like "2025-01-17:45" (date:DTE)
+EXPIRATION_KEY = re.compile(r"^\d{4}-\d{2}-\d{2}:-?\d+$")
+
+# Smallest listed strike increment by stock price (conservative, so the
+# server-side strike count never cuts strikes the client filter would keep)
+STRIKE_INCREMENTS = [(50, 0.5), (float('inf'), 1.0)]
+
+# Extra strike coverage (fraction of stock price) so a cached chain still
+# covers the window after the underlying moves, and the rounding step that
+# keeps strike_count (and the cache key) stable across small moves
+STRIKE_SLACK_PCT = 0.05
+STRIKE_COUNT_STEP = 20
+
+
+def plan_chain_request(today, stock_price=None, min_dte=MIN_DTE, max_dte=MAX_DTE,
+                       strike_pct=(MIN_STRIKE_PCT, MAX_STRIKE_PCT),
+                       contract_type=Client.Options.ContractType.ALL):
+    """
+    Translate a step's filter window into Schwab option chain parameters
+
+    The returned request is always a superset of the window: client-side
+    filtering stays in place and only the payload shrinks.
+
+    Args:
+        today: Reference date for DTE
+        stock_price: Underlying price; None requests all strikes
+        min_dte: Minimum days to expiration kept by the step
+        max_dte: Maximum days to expiration kept by the step
+        strike_pct: (low, high) strike window as fraction of stock price
+        contract_type: Client.Options.ContractType to request
+
+    Returns:
+        dict: Keyword arguments for client.get_option_chain
+    """
+    params = {
+        "contract_type": contract_type,
+        "from_date": today + timedelta(days=min_dte),
+        # One day of slack in case Schwab's DTE rounds differently
+        "to_date": today + timedelta(days=max_dte + 1),
+        "include_underlying_quote": False
+    }
+
+    if stock_price is None or strike_pct is None:
+        params["strike_range"] = Client.Options.StrikeRange.ALL
+        return params
+
+    increment = next(inc for limit, inc in STRIKE_INCREMENTS if stock_price < limit)
+    half_width = stock_price * (max(1 - strike_pct[0], strike_pct[1] - 1) + STRIKE_SLACK_PCT)
+
+    # Strikes on each side of ATM, doubled in case the count is split
+    # across both sides, rounded up to a stable step
+    strike_count = 2 * math.ceil(half_width / increment)
+    params["strike_count"] = STRIKE_COUNT_STEP * math.ceil(strike_count / STRIKE_COUNT_STEP)
+    return params
+
+
+def extract_greeks(option):
+    """
+    Pull Greeks and IV from a single Schwab option contract
+
+    Args:
+        option: Contract dict from callExpDateMap/putExpDateMap
+
+    Returns:
+        dict: delta, gamma, theta, vega, rho, iv
+    """
+    return {
+        'delta': option.get('delta', 0),
+        'gamma': option.get('gamma', 0),
+        'theta': option.get('theta', 0),
+        'vega': option.get('vega', 0),
+        'rho': option.get('rho', 0),
+        'iv': option.get('volatility', 0)
+    }
+
+
+class ChainParser:
+    """
+    Low-memory parser for Schwab option chain responses
+
+    Contracts are cut down to the requested fields while the JSON is being
+    decoded, and expirations/strikes outside the window are dropped as soon
+    as their maps are built, so the full nested response (dozens of fields
+    per contract) is never held in memory.
+    """
+
+    def __init__(self, stock_price=None, min_dte=None, max_dte=None,
+                 strike_pct=(MIN_STRIKE_PCT, MAX_STRIKE_PCT), fields=CONTRACT_FIELDS):
+        """
+        Args:
+            stock_price: Underlying price for the strike window (None keeps all strikes)
+            min_dte: Minimum DTE kept (None for no bound)
+            max_dte: Maximum DTE kept (None for no bound)
+            strike_pct: (low, high) strike window as fraction of stock price
+            fields: Contract fields to keep
+        """
+        self.min_dte = min_dte
+        self.max_dte = max_dte
+        self.fields = frozenset(fields)
+        self.strike_bounds = None
+        if stock_price is not None and strike_pct is not None:
+            self.strike_bounds = (strike_pct[0] * stock_price, strike_pct[1] * stock_price)
+
+    def _in_dte_window(self, exp_key):
+        dte = int(exp_key.split(':')[1])
+        if self.min_dte is not None and dte < self.min_dte:
+            return False
+        if self.max_dte is not None and dte > self.max_dte:
+            return False
+        return True
+
+    def _in_strike_window(self, strike_str):
+        if self.strike_bounds is None:
+            return True
+        return self.strike_bounds[0] <= float(strike_str) <= self.strike_bounds[1]
+
+    def _hook(self, pairs):
+        """object_pairs_hook: prune each JSON object as it is decoded"""
+        if not pairs:
+            return {}
+
+        first_key, first_value = pairs[0]
+
+        # Contract: keep only the requested fields
+        if any(key == 'putCall' for key, _ in pairs):
+            return {k: v for k, v in pairs if k in self.fields or k == 'putCall'}
+
+        # Strike map: {"150.0": [contract, ...]}
+        if isinstance(first_value, list):
+            try:
+                return {k: v for k, v in pairs if self._in_strike_window(k)}
+            except ValueError:
+                return dict(pairs)
+
+        # Expiration map: {"2025-01-17:45": {strike map}}
+        if EXPIRATION_KEY.match(first_key):
+            return {k: v for k, v in pairs if self._in_dte_window(k)}
+
+        return dict(pairs)
+
+    def parse(self, body):
+        """
+        Parse a chain response into a pruned Schwab-shaped dict
+
+        Args:
+            body: Raw response bytes or str
+
+        Returns:
+            dict: Chain with the same layout as response.json()
+        """
+        return json.loads(body, object_pairs_hook=self._hook)
+
+
+def build_expirations(chain_data, stock_price, with_greeks=False):
+    """
+    Build per-expiration strike records from a chain response
+
+    Args:
+        chain_data: Parsed Schwab option chain response
+        stock_price: Underlying mid price used for the strike window
+        with_greeks: Embed call_greeks/put_greeks from the same response
+
+    Returns:
+        list: Expirations sorted by DTE, each with strikes sorted by price
+    """
+    expirations = []
+
+    for exp_str, call_strikes in chain_data.get('callExpDateMap', {}).items():
+        # Format: "2025-01-17:45" (date:DTE)
+        exp_date_str, dte_str = exp_str.split(':')
+        dte = int(dte_str)
+
+        if not (MIN_DTE <= dte <= MAX_DTE):
+            continue
+
+        # Get corresponding put strikes
+        put_strikes = chain_data.get('putExpDateMap', {}).get(exp_str, {})
+
+        strikes_list = []
+
+        for strike_str in call_strikes.keys():
+            strike = float(strike_str)
+
+            if not (MIN_STRIKE_PCT * stock_price <= strike <= MAX_STRIKE_PCT * stock_price):
+                continue
+
+            strike_data = {"strike": strike}
+
+            if call_strikes[strike_str]:
+                call = call_strikes[strike_str][0]  # First contract
+                strike_data.update({
+                    "call_symbol": call.get('symbol', ''),
+                    "call_bid": call.get('bid', 0),
+                    "call_ask": call.get('ask', 0)
+                })
+                if with_greeks and call.get('symbol'):
+                    strike_data["call_greeks"] = extract_greeks(call)
+
+            if strike_str in put_strikes and put_strikes[strike_str]:
+                put = put_strikes[strike_str][0]  # First contract
+                strike_data.update({
+                    "put_symbol": put.get('symbol', ''),
+                    "put_bid": put.get('bid', 0),
+                    "put_ask": put.get('ask', 0)
+                })
+                if with_greeks and put.get('symbol'):
+                    strike_data["put_greeks"] = extract_greeks(put)
+
+            strikes_list.append(strike_data)
+
+        if strikes_list:
+            expirations.append({
+                "expiration_date": exp_date_str,
+                "dte": dte,
+                "strikes": sorted(strikes_list, key=lambda x: x['strike'])
+            })
+
+    return sorted(expirations, key=lambda x: x['dte'])
@@ -10,6 +10,7 @@ from dotenv import load_dotenv
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from schwab_client import get_schwab_client
+from quote_snapshot import BATCH_SIZE, REFRESH_MAX_AGE, QuoteSnapshot
 
 load_dotenv()
 
@@ -29,58 +30,44 @@ def filter_price_liquidity():
     passed = []
     failed = []
 
-    # Schwab allows up to 500 symbols per quote request
-    # Process in batches of 100 for better performance
-    batch_size = 100
-
-    for i in range(0, len(tickers), batch_size):
-        batch = tickers[i:i+batch_size]
-        symbols_str = ','.join(batch)
-
-        print(f"\nProcessing batch {i//batch_size + 1}/{(len(tickers)-1)//batch_size + 1}...")
-
-        try:
-            # Get quotes for batch
-            response = client.get_quotes(symbols_str)
-            response.raise_for_status()
-            quotes = response.json()
-
-            for ticker in batch:
-                if ticker in quotes and 'quote' in quotes[ticker]:
-                    quote = quotes[ticker]['quote']
-
-                    bid = quote.get('bidPrice', 0)
-                    ask = quote.get('askPrice', 0)
-
-                    if bid > 0 and ask > 0:
-                        mid = (bid + ask) / 2
-                        spread_pct = ((ask - bid) / mid) * 100
-
-                        # Filter: $30-400 price range, <2% spread
-                        if 30 <= mid <= 400 and spread_pct < 2.0:
-                            passed.append({
-                                'ticker': ticker,
-                                'bid': round(bid, 2),
-                                'ask': round(ask, 2),
-                                'mid': round(mid, 2),
-                                'spread_pct': round(spread_pct, 2)
-                            })
-                            print(f"   ✅ {ticker}: ${mid:.2f} (spread: {spread_pct:.2f}%)")
-                        else:
-                            reason = "price out of range" if (mid < 30 or mid > 400) else f"spread {spread_pct:.2f}%"
-                            failed.append({'ticker': ticker, 'reason': reason})
-                            print(f"   ❌ {ticker}: {reason}")
-                    else:
-                        failed.append({'ticker': ticker, 'reason': 'invalid bid/ask'})
-                        print(f"   ❌ {ticker}: invalid bid/ask")
+    # Full 500-symbol batches, fetched concurrently; step 01 reuses the snapshot
+    print(f"\nFetching quotes in batches of {BATCH_SIZE}...")
+    quotes, errors, _ = QuoteSnapshot(max_age=REFRESH_MAX_AGE).refresh(tickers, client)
+
+    for ticker in tickers:
+        if ticker in errors:
+            failed.append({'ticker': ticker, 'reason': f'API error: {str(errors[ticker])[:30]}'})
+            print(f"   ❌ {ticker}: batch failed")
+        elif ticker in quotes:
+            quote = quotes[ticker]
+
+            bid = quote.get('bidPrice', 0)
+            ask = quote.get('askPrice', 0)
+
+            if bid > 0 and ask > 0:
+                mid = (bid + ask) / 2
+                spread_pct = ((ask - bid) / mid) * 100
+
+                # Filter: $30-400 price range, <2% spread
+                if 30 <= mid <= 400 and spread_pct < 2.0:
+                    passed.append({
+                        'ticker': ticker,
+                        'bid': round(bid, 2),
+                        'ask': round(ask, 2),
+                        'mid': round(mid, 2),
+                        'spread_pct': round(spread_pct, 2)
+                    })
+                    print(f"   ✅ {ticker}: ${mid:.2f} (spread: {spread_pct:.2f}%)")
                 else:
-                    failed.append({'ticker': ticker, 'reason': 'no quote data'})
-                    print(f"   ❌ {ticker}: no quote data")
-
-        except Exception as e:
-            print(f"   ❌ Batch failed: {e}")
-            for ticker in batch:
-                failed.append({'ticker': ticker, 'reason': f'API error: {str(e)[:30]}'})
+                    reason = "price out of range" if (mid < 30 or mid > 400) else f"spread {spread_pct:.2f}%"
+                    failed.append({'ticker': ticker, 'reason': reason})
+                    print(f"   ❌ {ticker}: {reason}")
+            else:
+                failed.append({'ticker': ticker, 'reason': 'invalid bid/ask'})
+                print(f"   ❌ {ticker}: invalid bid/ask")
+        else:
+            failed.append({'ticker': ticker, 'reason': 'no quote data'})
+            print(f"   ❌ {ticker}: no quote data")
 
     return passed, failed
 
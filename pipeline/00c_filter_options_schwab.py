@@ -6,11 +6,12 @@ import sys
 import os
 from datetime import datetime
 from dotenv import load_dotenv
-from schwab.client import Client
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from schwab_client import get_schwab_client
+from fetch_engine import FetchEngine
+from option_chains import ChainParser, plan_chain_request
 
 load_dotenv()
 
@@ -32,20 +33,20 @@ def filter_options():
 
     today = datetime.now().date()
 
-    for stock_data in stocks:
-        ticker = stock_data['ticker']
+    # Get option chains up to 45 DTE, all strikes (shared with step 00d)
+    results = FetchEngine(client).fetch_chains(
+        [stock_data['ticker'] for stock_data in stocks],
+        # Only expirations and strike counts are used
+        parser=lambda ticker: ChainParser(fields=('symbol',)),
+        **plan_chain_request(today)
+    )
+
+    for stock_data, (ticker, chain_data, error) in zip(stocks, results):
         print(f"\n{ticker}...", end=" ")
 
         try:
-            # Get option chain for all expirations
-            response = client.get_option_chain(
-                ticker,
-                contract_type=Client.Options.ContractType.ALL,
-                include_underlying_quote=False
-            )
-            response.raise_for_status()
-
-            chain_data = response.json()
+            if error is not None:
+                raise error
 
             # Check if we have option data
             if 'callExpDateMap' not in chain_data or not chain_data['callExpDateMap']:
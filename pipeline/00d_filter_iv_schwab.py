@@ -7,11 +7,12 @@ import sys
 import os
 from datetime import datetime
 from dotenv import load_dotenv
-from schwab.client import Client
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from schwab_client import get_schwab_client
+from fetch_engine import FetchEngine
+from option_chains import ChainParser, plan_chain_request
 
 load_dotenv()
 
@@ -31,21 +32,21 @@ def get_iv_data():
     passed = []
     failed = []
 
-    for stock_data in stocks:
-        ticker = stock_data['ticker']
+    today = datetime.now().date()
+
+    # Get option chains with Greeks (cached by step 00c)
+    results = FetchEngine(client).fetch_chains(
+        [stock_data['ticker'] for stock_data in stocks],
+        parser=lambda ticker: ChainParser(fields=('symbol', 'volatility')),
+        **plan_chain_request(today)
+    )
+
+    for stock_data, (ticker, chain_data, error) in zip(stocks, results):
         print(f"\n{ticker}...", end=" ")
 
         try:
-            # Get option chain with Greeks
-            response = client.get_option_chain(
-                ticker,
-                contract_type=Client.Options.ContractType.CALL,
-                strike_count=5,  # Just get ATM strikes for IV check
-                include_underlying_quote=True
-            )
-            response.raise_for_status()
-
-            chain_data = response.json()
+            if error is not None:
+                raise error
 
             # Get underlying price
             underlying_price = chain_data.get('underlyingPrice', stock_data['mid'])
@@ -59,7 +60,14 @@ def get_iv_data():
             atm_iv = None
 
             for exp_str, strikes in chain_data['callExpDateMap'].items():
-                for strike_str, options in strikes.items():
+                # Just check the 5 strikes nearest ATM
+                atm_strikes = sorted(
+                    strikes.keys(),
+                    key=lambda s: abs(float(s) - underlying_price)
+                )[:5]
+
+                for strike_str in sorted(atm_strikes, key=float):
+                    options = strikes[strike_str]
                     if options:
                         option = options[0]
                         strike = float(strike_str)
@@ -11,6 +11,7 @@ from dotenv import load_dotenv
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from schwab_client import get_schwab_client
+from quote_snapshot import QuoteSnapshot
 
 load_dotenv()
 
@@ -43,19 +44,19 @@ def get_real_prices():
     failed = []
 
     try:
-        # Get all quotes in one request (Schwab supports up to 500 symbols)
-        symbols_str = ','.join(STOCKS)
-
+        # Reuse quotes from step 00B's snapshot; re-request only stale or missing
+        snapshot = QuoteSnapshot()
         print(f"📡 Fetching quotes for {len(STOCKS)} stocks...")
-        response = client.get_quotes(symbols_str)
-        response.raise_for_status()
+        quotes, errors, fetched = snapshot.refresh(STOCKS, client)
+
+        if errors:
+            raise next(iter(errors.values()))
 
-        quotes = response.json()
-        print("✅ Quotes received successfully")
+        print(f"✅ Quotes ready ({len(STOCKS) - fetched} reused from snapshot, {fetched} requested)")
 
         for ticker in STOCKS:
-            if ticker in quotes and 'quote' in quotes[ticker]:
-                quote = quotes[ticker]['quote']
+            if ticker in quotes:
+                quote = quotes[ticker]
 
                 bid = quote.get('bidPrice', 0)
                 ask = quote.get('askPrice', 0)
@@ -68,7 +69,7 @@ def get_real_prices():
                         "ask": round(ask, 2),
                         "mid": round(mid, 2),
                         "spread": round(ask - bid, 2),
-                        "timestamp": datetime.now().isoformat()
+                        "timestamp": datetime.fromtimestamp(quote['fetched_at']).isoformat()
                     }
                     print(f"   ✅ {ticker}: ${mid:.2f} (bid: ${bid:.2f}, ask: ${ask:.2f})")
                 else:
@@ -2,16 +2,20 @@
 Get Options Chains - Schwab API version
 Complete with symbols, strikes, and quotes
 """
+import argparse
 import json
 import sys
 import os
 from datetime import datetime
 from dotenv import load_dotenv
-from schwab.client import Client
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from schwab_client import get_schwab_client
+from chain_cache import get_chain_cache
+from chain_store import STORE_PATH, chains_to_frame, export_json, write_store
+from fetch_engine import FetchEngine
+from option_chains import MAX_DTE, MIN_DTE, ChainParser, build_expirations, plan_chain_request
 
 load_dotenv()
 
@@ -27,8 +31,16 @@ def load_stock_prices():
         sys.exit(1)
 
 
-def get_chains():
-    """Get option chains for all stocks"""
+def get_chains(with_greeks=False, write_json=False):
+    """
+    Get option chains for all stocks
+
+    Args:
+        with_greeks: Also store Greeks from the same responses, replacing
+            step 04
+        write_json: Also write chains.json (and chains_with_greeks.json)
+            for tools that read the old layout
+    """
     print("="*60)
     print("STEP 02: Get Options Chains (Schwab API)")
     print("="*60)
@@ -41,83 +53,32 @@ def get_chains():
 
     print("\n📊 Collecting chains with symbols...")
 
-    for ticker, price_data in prices.items():
-        stock_price = price_data["mid"]
+    # Get option chains narrowed server-side to 0-45 DTE, 70-130% strikes.
+    # Cached chains are reused while the underlying hasn't moved much.
+    results = FetchEngine(client).fetch_chains(
+        list(prices.keys()),
+        plan=lambda ticker: plan_chain_request(today, prices[ticker]["mid"]),
+        parser=lambda ticker: ChainParser(prices[ticker]["mid"], MIN_DTE, MAX_DTE),
+        spots={ticker: price_data["mid"] for ticker, price_data in prices.items()}
+    )
+
+    for ticker, chain_data, error in results:
+        stock_price = prices[ticker]["mid"]
         print(f"\n{ticker}: ${stock_price:.2f}")
 
         try:
-            # Get full option chain (0-45 DTE, 70-130% strikes)
-            response = client.get_option_chain(
-                ticker,
-                contract_type=Client.Options.ContractType.ALL,
-                strike_range=Client.Options.StrikeRange.ALL,
-                from_date=today,
-                include_underlying_quote=False
-            )
-            response.raise_for_status()
-
-            chain_data = response.json()
+            if error is not None:
+                raise error
 
             if 'callExpDateMap' not in chain_data or not chain_data['callExpDateMap']:
                 print(f"   ❌ No option chain")
                 continue
 
-            ticker_expirations = []
-
-            # Process each expiration
-            for exp_str, call_strikes in chain_data['callExpDateMap'].items():
-                # Format: "2025-01-17:45" (date:DTE)
-                exp_date_str, dte_str = exp_str.split(':')
-                exp_date = datetime.strptime(exp_date_str, '%Y-%m-%d').date()
-                dte = int(dte_str)
-
-                if not (0 <= dte <= 45):
-                    continue
-
-                # Get corresponding put strikes
-                put_strikes = chain_data.get('putExpDateMap', {}).get(exp_str, {})
-
-                strikes_list = []
-
-                # Process each strike price
-                for strike_str in call_strikes.keys():
-                    strike = float(strike_str)
-
-                    # Filter: 70-130% of stock price
-                    if not (0.70 * stock_price <= strike <= 1.30 * stock_price):
-                        continue
-
-                    strike_data = {"strike": strike}
-
-                    # Get call data
-                    if strike_str in call_strikes and call_strikes[strike_str]:
-                        call = call_strikes[strike_str][0]  # First contract
-                        strike_data.update({
-                            "call_symbol": call.get('symbol', ''),
-                            "call_bid": call.get('bid', 0),
-                            "call_ask": call.get('ask', 0)
-                        })
-
-                    # Get put data
-                    if strike_str in put_strikes and put_strikes[strike_str]:
-                        put = put_strikes[strike_str][0]  # First contract
-                        strike_data.update({
-                            "put_symbol": put.get('symbol', ''),
-                            "put_bid": put.get('bid', 0),
-                            "put_ask": put.get('ask', 0)
-                        })
-
-                    strikes_list.append(strike_data)
-
-                if strikes_list:
-                    ticker_expirations.append({
-                        "expiration_date": exp_date_str,
-                        "dte": dte,
-                        "strikes": sorted(strikes_list, key=lambda x: x['strike'])
-                    })
+            # Process each expiration (0-45 DTE, 70-130% strikes)
+            ticker_expirations = build_expirations(chain_data, stock_price, with_greeks)
 
             if ticker_expirations:
-                chains[ticker] = sorted(ticker_expirations, key=lambda x: x['dte'])
+                chains[ticker] = ticker_expirations
                 total_strikes = sum(len(exp['strikes']) for exp in ticker_expirations)
                 print(f"   ✅ {len(ticker_expirations)} expirations, {total_strikes} strikes")
             else:
@@ -126,22 +87,37 @@ def get_chains():
         except Exception as e:
             print(f"   ❌ Error: {str(e)[:50]}")
 
-    # Save output
-    output = {
-        "timestamp": datetime.now().isoformat(),
-        "total_tickers": len(chains),
-        "chains": chains
-    }
+    cache = get_chain_cache()
+    print(f"\n✅ Chains collected for {len(chains)} tickers")
+    print(f"   ♻️ {cache.hits} reused from cache, {cache.misses} fetched")
 
-    with open("data/chains.json", "w") as f:
-        json.dump(output, f, indent=2)
+    frame = chains_to_frame(chains)
 
-    print(f"\n✅ Chains collected for {len(chains)} tickers")
-    print(f"   Saved to data/chains.json")
+    # JSON exports go first: readers fall back to them only when they are
+    # newer than the store
+    if write_json:
+        for path in export_json(frame):
+            print(f"   Saved to {path}")
 
+    # One columnar snapshot; Greeks columns stay empty without --with-greeks
+    write_store(frame, tickers=list(chains))
+    print(f"   Saved to {STORE_PATH}" + (" (Greeks embedded)" if with_greeks else ""))
 
 def main():
-    get_chains()
+    parser = argparse.ArgumentParser(description="Get option chains from Schwab")
+    parser.add_argument(
+        "--with-greeks",
+        action="store_true",
+        help="Store Greeks from the same responses (skips step 04)"
+    )
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Also write chains.json / chains_with_greeks.json in the old layout"
+    )
+    args = parser.parse_args()
+
+    get_chains(with_greeks=args.with_greeks, write_json=args.json)
     print("Step 02 complete")
 
 
@@ -1,81 +1,99 @@
 """
 FIXED Liquidity Checker - Works with multiple expirations
-Processes ALL expirations from chains.json
+Processes ALL expirations from the chain store (data/chains.parquet)
 """
 import json
 import asyncio
+import sys
+import os
 from datetime import datetime
 
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from chain_store import SIDE_CODES, read_store, strike_rows
+
 def load_chains():
-    """Load chains data"""
+    """Load quotes of every contract from the chain store"""
     try:
-        with open("data/chains.json", "r") as f:
-            return json.load(f)
+        return read_store(columns=("bid", "ask"))
     except FileNotFoundError:
-        print("❌ chains.json not found")
+        print("❌ chains.parquet not found")
         return None
 
+def liquid_contracts(bid, ask):
+    """Mid ≥ $0.30 and bid/ask spread < 10% of mid, per contract"""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mid = np.where(ask > 0, (bid + ask) / 2, 0)
+        spread = np.where(ask > bid, ask - bid, np.inf)
+        spread_pct = np.where(mid > 0, spread / mid * 100, np.inf)
+    return (mid >= 0.30) & (spread_pct < 10)
+
 async def check_option_liquidity():
     """Check liquidity for all options with multiple expirations"""
     print("💧 Checking liquidity for ALL expirations...")
     
-    chains_data = load_chains()
-    if not chains_data or not chains_data.get("chains"):
+    contracts = load_chains()
+    if contracts is None or len(contracts) == 0:
         print("❌ No chains to check")
         return {}
     
+    # One row per strike with both sides' quotes (0 when a side is missing)
+    row, new_ticker, new_expiration = strike_rows(contracts)
+    strikes = np.zeros(row[-1] + 1)
+    strikes[row] = contracts["strike"].to_numpy()
+    quotes = {}
+    put_call = contracts["put_call"].to_numpy()
+    liquid = liquid_contracts(contracts["bid"].to_numpy(), contracts["ask"].to_numpy())
+
+    for side, code in SIDE_CODES:
+        sel = put_call == code
+        for field, values in (("bid", contracts["bid"].to_numpy()), ("ask", contracts["ask"].to_numpy()),
+                              ("liquid", liquid)):
+            column = np.zeros(len(strikes), dtype=values.dtype)
+            column[row[sel]] = values[sel]
+            quotes[f"{side}_{field}"] = column
+
+    any_liquid = quotes["call_liquid"] | quotes["put_liquid"]
+
+    # Strike rows where each ticker / expiration starts
+    tickers = contracts["ticker"].to_numpy()[new_ticker]
+    ticker_start = np.r_[row[new_ticker], len(strikes)]
+    exp_rows = np.flatnonzero(new_expiration)
+    exp_start = np.r_[row[exp_rows], len(strikes)]
+
     liquid_chains = {}
     total_liquid_options = 0
+    exp_no = 0
     
-    for ticker, expirations_list in chains_data["chains"].items():
+    for n, ticker in enumerate(tickers):
         print(f"\n{ticker}: Checking liquidity...")
         
         ticker_liquid_exps = []
         
         # Process each expiration
-        for exp_data in expirations_list:
-            exp_date = exp_data["expiration_date"]
-            dte = exp_data["dte"]
-            strikes = exp_data["strikes"]
-            
-            liquid_strikes = []
+        while exp_no < len(exp_rows) and exp_start[exp_no] < ticker_start[n + 1]:
+            first = exp_rows[exp_no]
+            start, stop = exp_start[exp_no], exp_start[exp_no + 1]
+            exp_no += 1
             
-            for strike_data in strikes:
-                strike = strike_data["strike"]
-                
-                # Calculate liquidity score for calls
-                call_bid = strike_data.get("call_bid", 0)
-                call_ask = strike_data.get("call_ask", 0)
-                call_mid = (call_bid + call_ask) / 2 if call_ask > 0 else 0
-                call_spread = call_ask - call_bid if call_ask > call_bid else float('inf')
-                call_spread_pct = (call_spread / call_mid * 100) if call_mid > 0 else float('inf')
-                
-                # Calculate liquidity score for puts  
-                put_bid = strike_data.get("put_bid", 0)
-                put_ask = strike_data.get("put_ask", 0)
-                put_mid = (put_bid + put_ask) / 2 if put_ask > 0 else 0
-                put_spread = put_ask - put_bid if put_ask > put_bid else float('inf')
-                put_spread_pct = (put_spread / put_mid * 100) if put_mid > 0 else float('inf')
-                
-                # Liquidity criteria
-                call_liquid = (call_mid >= 0.30 and call_spread_pct < 10)
-                put_liquid = (put_mid >= 0.30 and put_spread_pct < 10)
-                
-                if call_liquid or put_liquid:
-                    liquid_strikes.append({
-                        "strike": strike,
-                        "call_bid": call_bid,
-                        "call_ask": call_ask,
-                        "call_liquid": call_liquid,
-                        "put_bid": put_bid,
-                        "put_ask": put_ask,
-                        "put_liquid": put_liquid
-                    })
+            liquid_strikes = [
+                {
+                    "strike": float(strikes[i]),
+                    "call_bid": float(quotes["call_bid"][i]),
+                    "call_ask": float(quotes["call_ask"][i]),
+                    "call_liquid": bool(quotes["call_liquid"][i]),
+                    "put_bid": float(quotes["put_bid"][i]),
+                    "put_ask": float(quotes["put_ask"][i]),
+                    "put_liquid": bool(quotes["put_liquid"][i])
+                }
+                for i in start + np.flatnonzero(any_liquid[start:stop])
+            ]
             
             if liquid_strikes:
                 ticker_liquid_exps.append({
-                    "expiration_date": exp_date,
-                    "dte": dte,
+                    "expiration_date": contracts["expiration_date"].iat[first],
+                    "dte": int(contracts["dte"].iat[first]),
                     "strikes": liquid_strikes
                 })
                 total_liquid_options += len(liquid_strikes)
@@ -2,50 +2,67 @@
 Get Greeks - Schwab API version
 Greeks (delta, gamma, theta, vega, IV) are included in option chain data
 """
+import argparse
 import json
 import sys
 import os
 from datetime import datetime
 from dotenv import load_dotenv
-from schwab.client import Client
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from schwab_client import get_schwab_client
+from chain_store import STORE_PATH, chains_to_frame, export_json, load_chains, write_store
+from fetch_engine import FetchEngine
+from option_chains import MAX_DTE, MIN_DTE, ChainParser, extract_greeks, plan_chain_request
 
 load_dotenv()
 
 
-def get_greeks():
-    """Embed Greeks into chains data structure"""
+def get_greeks(write_json=False):
+    """
+    Embed Greeks into the chain store
+
+    Args:
+        write_json: Also write chains_with_greeks.json in the old layout
+    """
     print("="*60)
     print("STEP 04: Get Greeks (Schwab API)")
     print("="*60)
 
     # Load chains from step 02
-    with open("data/chains.json", "r") as f:
-        chains_data = json.load(f)
+    chains = load_chains(with_greeks=False)
+
+    # Stock prices from step 01 size each ticker's strike window
+    with open("data/stock_prices.json", "r") as f:
+        prices = json.load(f)["prices"]
 
     client = get_schwab_client()
-    chains = chains_data["chains"]
 
     print(f"\n🧮 Fetching Greeks for {len(chains)} tickers...")
 
     chains_with_greeks = {}
-
-    for ticker, expirations in chains.items():
+    today = datetime.now().date()
+
+    # Get option chains with Greeks, same requests as step 02 (cached)
+    results = FetchEngine(client).fetch_chains(
+        list(chains.keys()),
+        plan=lambda ticker: plan_chain_request(
+            today, prices[ticker]["mid"] if ticker in prices else None
+        ),
+        parser=lambda ticker: ChainParser(
+            prices[ticker]["mid"] if ticker in prices else None, MIN_DTE, MAX_DTE
+        ),
+        spots={ticker: price_data["mid"] for ticker, price_data in prices.items()}
+    )
+
+    for ticker, chain_data, error in results:
+        expirations = chains[ticker]
         print(f"\n{ticker}...", end=" ")
 
         try:
-            # Get full option chain with Greeks
-            response = client.get_option_chain(
-                ticker,
-                contract_type=Client.Options.ContractType.ALL,
-                include_underlying_quote=False
-            )
-            response.raise_for_status()
-
-            chain_data = response.json()
+            if error is not None:
+                raise error
 
             # Create lookup maps for Greeks by symbol
             greeks_map = {}
@@ -57,14 +74,7 @@ def get_greeks():
                         opt = options[0]
                         symbol = opt.get('symbol', '')
                         if symbol:
-                            greeks_map[symbol] = {
-                                'delta': opt.get('delta', 0),
-                                'gamma': opt.get('gamma', 0),
-                                'theta': opt.get('theta', 0),
-                                'vega': opt.get('vega', 0),
-                                'rho': opt.get('rho', 0),
-                                'iv': opt.get('volatility', 0)
-                            }
+                            greeks_map[symbol] = extract_greeks(opt)
 
             # Extract Greeks from puts
             for exp_str, strikes in chain_data.get('putExpDateMap', {}).items():
@@ -73,14 +83,7 @@ def get_greeks():
                         opt = options[0]
                         symbol = opt.get('symbol', '')
                         if symbol:
-                            greeks_map[symbol] = {
-                                'delta': opt.get('delta', 0),
-                                'gamma': opt.get('gamma', 0),
-                                'theta': opt.get('theta', 0),
-                                'vega': opt.get('vega', 0),
-                                'rho': opt.get('rho', 0),
-                                'iv': opt.get('volatility', 0)
-                            }
+                            greeks_map[symbol] = extract_greeks(opt)
 
             # Embed Greeks into existing chain structure
             ticker_expirations_with_greeks = []
@@ -127,22 +130,30 @@ def get_greeks():
             # Keep original data without Greeks
             chains_with_greeks[ticker] = expirations
 
-    # Save output
-    output = {
-        "timestamp": datetime.now().isoformat(),
-        "total_tickers": len(chains_with_greeks),
-        "chains_with_greeks": chains_with_greeks
-    }
+    print(f"\n✅ Greeks embedded for {len(chains_with_greeks)} tickers")
 
-    with open("data/chains_with_greeks.json", "w") as f:
-        json.dump(output, f, indent=2)
+    frame = chains_to_frame(chains_with_greeks)
 
-    print(f"\n✅ Greeks embedded for {len(chains_with_greeks)} tickers")
-    print(f"   Saved to data/chains_with_greeks.json")
+    # The JSON export goes first: readers fall back to it only when it is
+    # newer than the store
+    if write_json:
+        for path in export_json(frame):
+            print(f"   Saved to {path}")
 
+    # Save output
+    write_store(frame, tickers=list(chains))
+    print(f"   Saved to {STORE_PATH}")
 
 def main():
-    get_greeks()
+    parser = argparse.ArgumentParser(description="Embed Greeks into the option chain store")
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Also write chains_with_greeks.json in the old layout"
+    )
+    args = parser.parse_args()
+
+    get_greeks(write_json=args.json)
     print("Step 04 complete")
 
 
@@ -2,191 +2,163 @@
 Calculate Credit Spreads using Black-Scholes PoP
 Professional-grade probability calculations
 """
+import argparse
 import json
 import sys
 import os
-import math
 from datetime import datetime
-from scipy.stats import norm
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from chain_arrays import load_arrays
+from spread_engine import all_spreads
+from spread_cache import SpreadCache
+from monte_carlo import MC_PATHS, MC_SEED, simulate_spreads
+from spread_ranking import rank_spreads, ranked_output, print_ranking
+from spread_records import SpreadTable
 
-def black_scholes_pop(stock_price, strike, dte, iv, is_call):
-    """Calculate PoP using Black-Scholes"""
-    if dte <= 0 or iv <= 0:
-        return 0
-    
-    T = dte / 365.0
-    r = 0.05
-    
-    d1 = (math.log(stock_price / strike) + (r + 0.5 * iv**2) * T) / (iv * math.sqrt(T))
-    d2 = d1 - iv * math.sqrt(T)
-    
-    if is_call:
-        pop = norm.cdf(-d2) * 100
-    else:
-        pop = norm.cdf(d2) * 100
-    
-    return pop
-
-def calculate_spreads():
+def calculate_spreads(max_width=None, workers=1, full=False, rank=False,
+                      per_ticker=1, top_n=None, audit=False, write_json=False,
+                      monte_carlo=False, mc_paths=MC_PATHS, mc_seed=MC_SEED):
     print("="*60)
     print("STEP 5: Calculate Spreads (Black-Scholes)")
     print("="*60)
     
-    with open("data/chains_with_greeks.json", "r") as f:
-        data = json.load(f)
-    chains = data["chains_with_greeks"]
-    
     with open("data/stock_prices.json", "r") as f:
         prices = json.load(f)["prices"]
     
+    # Tradable expirations of priced tickers, memory-mapped from the chain arrays
+    chains, packed, mapped = load_arrays(tickers=list(prices))
+    
     print("\n📊 Building spreads with Black-Scholes PoP...")
     
-    all_spreads = []
+    if workers != 1:
+        print(f"   Using {workers or os.cpu_count()} worker processes")
     
-    for ticker, expirations in chains.items():
-        if ticker not in prices:
-            continue
-            
-        stock_price = prices[ticker]["mid"]
-        print(f"\n{ticker}: ${stock_price:.2f}")
+    # In rank mode only each ticker's best spreads are materialized,
+    # unless the full list is also wanted for audit
+    top_k = per_ticker if rank and not audit else None
+    
+    # Vectorized pair search over each expiration's strikes; tickers whose
+    # quotes and Greeks are unchanged since the last run reuse their spreads
+    cache = SpreadCache(reuse=not full)
+    by_ticker = all_spreads(chains, prices, workers=workers, max_width=max_width,
+                            cache=cache, top_k=top_k, packed=packed, mapped=mapped)
+    print(f"   ♻️  {cache.hits} tickers unchanged, {cache.misses} rebuilt")
+    
+    for ticker, found in by_ticker.items():
+        print(f"\n{ticker}: ${prices[ticker]['mid']:.2f}")
+        if top_k is None:
+            print(f"   ✅ {len(found)} quality spreads")
+        elif len(found):
+            print(f"   ✅ best ROI {found.records['roi'][0]}% | PoP {found.records['pop'][0]}%")
+    
+    # Compact columnar table; JSON is only written on request
+    spreads = SpreadTable.concat(by_ticker.values())
+    
+    if monte_carlo:
+        # Breakeven PoP, touch probability and expected P&L on shared paths
+        simulate_spreads(spreads, paths=mc_paths, seed=mc_seed)
+        print(f"\n🎲 Monte Carlo: {len(spreads)} spreads on {mc_paths} paths (seed {mc_seed})")
+    
+    if top_k is None:
+        spreads.save("data/spreads.npz")
         
-        for exp_data in expirations:
-            dte = exp_data["dte"]
-            
-            if dte < 7 or dte > 45:
-                continue
-            
-            strikes = exp_data["strikes"]
+        if write_json:
+            output = {
+                "timestamp": datetime.now().isoformat(),
+                "total_spreads": len(spreads),
+                "spreads": spreads.to_dicts()
+            }
             
-            # Bull Put Spreads
-            for i in range(len(strikes)):
-                for j in range(i):
-                    short_strike = strikes[i]
-                    long_strike = strikes[j]
-                    
-                    if "put_greeks" not in short_strike or "put_greeks" not in long_strike:
-                        continue
-                    
-                    short_iv = short_strike["put_greeks"]["iv"]
-                    short_delta = abs(short_strike["put_greeks"]["delta"])
-                    
-                    if short_delta < 0.15 or short_delta > 0.35:
-                        continue
-                    
-                    short_bid = short_strike.get("put_bid", 0)
-                    long_ask = long_strike.get("put_ask", 0)
-                    
-                    if short_bid <= 0 or long_ask <= 0:
-                        continue
-                    
-                    net_credit = short_bid - long_ask
-                    width = short_strike["strike"] - long_strike["strike"]
-                    
-                    if net_credit <= 0.10 or width <= 0:
-                        continue
-                    
-                    max_loss = width - net_credit
-                    roi = (net_credit / max_loss) * 100
-                    
-                    pop = black_scholes_pop(
-                        stock_price,
-                        short_strike["strike"],
-                        dte,
-                        short_iv,
-                        is_call=False
-                    )
-                    
-                    if roi >= 5 and roi <= 50 and pop >= 60:
-                        spread = {
-                            "ticker": ticker,
-                            "type": "Bull Put",
-                            "stock_price": round(stock_price, 2),
-                            "short_strike": short_strike["strike"],
-                            "long_strike": long_strike["strike"],
-                            "width": round(width, 2),
-                            "net_credit": round(net_credit, 2),
-                            "max_loss": round(max_loss, 2),
-                            "roi": round(roi, 1),
-                            "pop": round(pop, 1),
-                            "short_iv": round(short_iv * 100, 1),
-                            "short_delta": round(short_delta, 2),
-                            "expiration": {"date": exp_data["expiration_date"], "dte": dte}
-                        }
-                        all_spreads.append(spread)
-            
-            # Bear Call Spreads
-            for i in range(len(strikes)):
-                for j in range(i + 1, len(strikes)):
-                    short_strike = strikes[i]
-                    long_strike = strikes[j]
-                    
-                    if "call_greeks" not in short_strike or "call_greeks" not in long_strike:
-                        continue
-                    
-                    short_iv = short_strike["call_greeks"]["iv"]
-                    short_delta = abs(short_strike["call_greeks"]["delta"])
-                    
-                    if short_delta < 0.15 or short_delta > 0.35:
-                        continue
-                    
-                    short_bid = short_strike.get("call_bid", 0)
-                    long_ask = long_strike.get("call_ask", 0)
-                    
-                    if short_bid <= 0 or long_ask <= 0:
-                        continue
-                    
-                    net_credit = short_bid - long_ask
-                    width = long_strike["strike"] - short_strike["strike"]
-                    
-                    if net_credit <= 0.10 or width <= 0:
-                        continue
-                    
-                    max_loss = width - net_credit
-                    roi = (net_credit / max_loss) * 100
-                    
-                    pop = black_scholes_pop(
-                        stock_price,
-                        short_strike["strike"],
-                        dte,
-                        short_iv,
-                        is_call=True
-                    )
-                    
-                    if roi >= 5 and roi <= 50 and pop >= 60:
-                        spread = {
-                            "ticker": ticker,
-                            "type": "Bear Call",
-                            "stock_price": round(stock_price, 2),
-                            "short_strike": short_strike["strike"],
-                            "long_strike": long_strike["strike"],
-                            "width": round(width, 2),
-                            "net_credit": round(net_credit, 2),
-                            "max_loss": round(max_loss, 2),
-                            "roi": round(roi, 1),
-                            "pop": round(pop, 1),
-                            "short_iv": round(short_iv * 100, 1),
-                            "short_delta": round(short_delta, 2),
-                            "expiration": {"date": exp_data["expiration_date"], "dte": dte}
-                        }
-                        all_spreads.append(spread)
+            with open("data/spreads.json", "w") as f:
+                json.dump(output, f, indent=2)
         
-        ticker_spreads = len([s for s in all_spreads if s["ticker"] == ticker])
-        print(f"   ✅ {ticker_spreads} quality spreads")
-    
-    output = {
-        "timestamp": datetime.now().isoformat(),
-        "total_spreads": len(all_spreads),
-        "spreads": all_spreads
-    }
-    
-    with open("data/spreads.json", "w") as f:
-        json.dump(output, f, indent=2)
+        print(f"\n✅ Total spreads: {len(spreads)}")
+        print(f"   Bull Puts: {spreads.count('Bull Put')}")
+        print(f"   Bear Calls: {spreads.count('Bear Call')}")
     
-    print(f"\n✅ Total spreads: {len(all_spreads)}")
-    print(f"   Bull Puts: {len([s for s in all_spreads if s['type'] == 'Bull Put'])}")
-    print(f"   Bear Calls: {len([s for s in all_spreads if s['type'] == 'Bear Call'])}")
+    if rank:
+        # Fused step 06: score and keep the best spread per ticker
+        ranked = rank_spreads(spreads, per_ticker=per_ticker, top_n=top_n)
+        ranked.save("data/ranked_spreads.npz")
+        output = ranked_output(ranked.to_dicts(ranked=True))
+        
+        with open("data/ranked_spreads.json", "w") as f:
+            json.dump(output, f, indent=2)
+        
+        print_ranking(output)
+        print("\n✅ Ranked spreads saved to ranked_spreads.npz (step 06 not needed)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Calculate credit spreads")
+    parser.add_argument(
+        "--max-width",
+        type=float,
+        default=None,
+        help="Skip spreads wider than this many dollars (default: no limit)"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Worker processes for spread building (0 = all cores, default: 1)"
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Rebuild every ticker instead of reusing unchanged cached spreads"
+    )
+    parser.add_argument(
+        "--rank",
+        action="store_true",
+        help="Also rank spreads (replaces step 06), keeping only each ticker's best"
+    )
+    parser.add_argument(
+        "--per-ticker",
+        type=int,
+        default=1,
+        help="With --rank: spreads kept per ticker (default: 1)"
+    )
+    parser.add_argument(
+        "--top",
+        type=int,
+        default=None,
+        help="With --rank: spreads kept overall (default: one per ticker)"
+    )
+    parser.add_argument(
+        "--audit",
+        action="store_true",
+        help="With --rank: still write every spread to spreads.npz"
+    )
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Also export every spread to spreads.json (large)"
+    )
+    parser.add_argument(
+        "--monte-carlo",
+        action="store_true",
+        help="Add Monte Carlo breakeven PoP, touch probability and expected P&L"
+    )
+    parser.add_argument(
+        "--mc-paths",
+        type=int,
+        default=MC_PATHS,
+        help=f"With --monte-carlo: simulated paths (default: {MC_PATHS})"
+    )
+    parser.add_argument(
+        "--mc-seed",
+        type=int,
+        default=MC_SEED,
+        help=f"With --monte-carlo: random seed (default: {MC_SEED})"
+    )
+    args = parser.parse_args()
+
+    calculate_spreads(max_width=args.max_width, workers=args.workers, full=args.full,
+                      rank=args.rank, per_ticker=args.per_ticker, top_n=args.top,
+                      audit=args.audit, write_json=args.json, monte_carlo=args.monte_carlo,
+                      mc_paths=args.mc_paths, mc_seed=args.mc_seed)
+
 
 if __name__ == "__main__":
-    calculate_spreads()
+    main()
@@ -0,0 +1,80 @@
+"""
+Build Iron Condors from Bull Put / Bear Call candidates
+Joins the step 05 verticals on ticker and expiration
+"""
+import argparse
+import json
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from chain_arrays import load_arrays
+from condor_engine import (
+    CONDORS_PER_EXPIRATION, MAX_CONDOR_ROI, MIN_CONDOR_POP, MIN_CONDOR_ROI, build_condors
+)
+from spread_cache import SpreadCache
+from spread_engine import all_spreads
+from spread_ranking import rank_spreads, ranked_output
+from spread_records import SpreadTable
+
+def build_iron_condors(min_pop=MIN_CONDOR_POP, min_roi=MIN_CONDOR_ROI, max_roi=MAX_CONDOR_ROI,
+                       per_expiration=CONDORS_PER_EXPIRATION, workers=1):
+    print("="*60)
+    print("STEP 5B: Build Iron Condors")
+    print("="*60)
+    
+    with open("data/stock_prices.json", "r") as f:
+        prices = json.load(f)["prices"]
+    
+    chains, packed, mapped = load_arrays(tickers=list(prices))
+    
+    # Every vertical candidate (reused from the step 05 cache when unchanged)
+    spreads = SpreadTable.concat(all_spreads(chains, prices, workers=workers, cache=SpreadCache(),
+                                             packed=packed, mapped=mapped).values())
+    print(f"\n📊 {spreads.count('Bull Put')} Bull Puts x {spreads.count('Bear Call')} Bear Calls")
+    
+    condors = build_condors(spreads, min_pop=min_pop, min_roi=min_roi, max_roi=max_roi,
+                            top_k=per_expiration)
+    condors.save("data/condors.npz")
+    print(f"   ✅ {len(condors)} iron condors (PoP ≥{min_pop}%, ROI {min_roi}-{max_roi}%)")
+    
+    # Best condor per ticker
+    ranked = rank_spreads(condors)
+    output = ranked_output(ranked.to_dicts(ranked=True))
+    
+    with open("data/ranked_condors.json", "w") as f:
+        json.dump(output, f, indent=2)
+    
+    print(f"\n🎯 Top 9 Iron Condors:")
+    for condor in output["ranked_spreads"][:9]:
+        legs = f"${condor['put_long']:.0f}/${condor['put_short']:.0f}/${condor['call_short']:.0f}/${condor['call_long']:.0f}"
+        print(f"   #{condor['rank']}: {condor['ticker']} {legs} {condor['expiration']['date']}")
+        print(f"        Score: {condor['score']} | ROI: {condor['roi']}% | PoP: {condor['pop']}%")
+    
+    print("\n✅ Step 5B complete: condors.npz, ranked_condors.json")
+
+def main():
+    parser = argparse.ArgumentParser(description="Build iron condors from vertical spreads")
+    parser.add_argument("--min-pop", type=float, default=MIN_CONDOR_POP, help="Minimum joint PoP %%")
+    parser.add_argument("--min-roi", type=float, default=MIN_CONDOR_ROI, help="Minimum ROI %%")
+    parser.add_argument("--max-roi", type=float, default=MAX_CONDOR_ROI, help="Maximum ROI %%")
+    parser.add_argument(
+        "--per-expiration",
+        type=int,
+        default=CONDORS_PER_EXPIRATION,
+        help="Best condors kept per ticker and expiration (0 = all)"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Worker processes for vertical building (0 = all cores)"
+    )
+    args = parser.parse_args()
+
+    build_iron_condors(min_pop=args.min_pop, min_roi=args.min_roi, max_roi=args.max_roi,
+                       per_expiration=args.per_expiration or None, workers=args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Sweep Spread Thresholds
+Evaluates a grid of step 05 filters and step 06 ENTER/WATCH rules against
+the current chain snapshot in one pass
+"""
+import argparse
+import json
+import sys
+import os
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from chain_arrays import load_arrays
+from spread_engine import MAX_WIDTH
+from threshold_sweep import SWEEP_PARAMS, expand_grid, run_sweep
+
+# CLI flag per sweep parameter
+FLAGS = {
+    "min_short_delta": "--min-delta",
+    "max_short_delta": "--max-delta",
+    "min_net_credit": "--min-credit",
+    "min_roi": "--min-roi",
+    "max_roi": "--max-roi",
+    "min_pop": "--min-pop",
+    "enter_pop": "--enter-pop",
+    "enter_roi": "--enter-roi",
+    "watch_pop": "--watch-pop",
+    "watch_roi": "--watch-roi",
+}
+
+def sweep_thresholds(settings, top=3, max_width=MAX_WIDTH):
+    print("="*60)
+    print("STEP 5C: Sweep Spread Thresholds")
+    print("="*60)
+
+    with open("data/stock_prices.json", "r") as f:
+        prices = json.load(f)["prices"]
+
+    chains, packed, _ = load_arrays(tickers=list(prices))
+
+    print(f"\n📊 {len(settings)} settings over {len(chains)} tickers")
+    report = run_sweep(chains, prices, settings, top=top, max_width=max_width, packed=packed)
+
+    with open("data/threshold_sweep.json", "w") as f:
+        json.dump({"timestamp": datetime.now().isoformat(), "settings": report}, f, indent=2)
+
+    for n, result in enumerate(report, 1):
+        t = result["thresholds"]
+        print(f"\n#{n}: delta {t['min_short_delta']}-{t['max_short_delta']} | credit >{t['min_net_credit']} | "
+              f"ROI {t['min_roi']}-{t['max_roi']}% | PoP ≥{t['min_pop']}% | "
+              f"ENTER {t['enter_pop']}/{t['enter_roi']} | WATCH {t['watch_pop']}/{t['watch_roi']}")
+        print(f"   {result['candidates']} candidates ({result['bull_puts']} Bull Put, {result['bear_calls']} Bear Call) | "
+              f"{result['tickers']} tickers: 🟢 {result['enter']} 🟡 {result['watch']} 🔴 {result['skip']}")
+        for pick in result["top"]:
+            print(f"      {pick['ticker']} {pick['type']} {pick['legs']} {pick['expiration']} "
+                  f"Score: {pick['score']} | ROI: {pick['roi']}% | PoP: {pick['pop']}%")
+
+    print("\n✅ Step 5C complete: threshold_sweep.json")
+
+def parse_values(text):
+    """Comma-separated list of numbers"""
+    return [float(v) for v in text.split(",") if v.strip()]
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Evaluate a grid of spread thresholds against one chain snapshot",
+        epilog="Each threshold flag takes a comma-separated list; the grid is every combination. "
+               "Thresholds not given keep their step 05/06 defaults."
+    )
+    for param, flag in FLAGS.items():
+        parser.add_argument(flag, dest=param, type=parse_values, help=f"Values for {param}")
+    parser.add_argument(
+        "--grid",
+        help="JSON file with a list of settings objects (keys: " + ", ".join(SWEEP_PARAMS) + ")"
+    )
+    parser.add_argument("--top", type=int, default=3, help="Top picks reported per setting")
+    parser.add_argument("--max-width", type=float, default=MAX_WIDTH, help="Skip spreads wider than this")
+    args = parser.parse_args()
+
+    if args.grid:
+        with open(args.grid, "r") as f:
+            settings = json.load(f)
+    else:
+        settings = expand_grid({p: getattr(args, p) for p in FLAGS if getattr(args, p)})
+
+    sweep_thresholds(settings, top=args.top, max_width=args.max_width)
+
+
+if __name__ == "__main__":
+    main()
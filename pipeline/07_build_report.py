@@ -7,16 +7,17 @@ import os
 from datetime import datetime
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from spread_records import SpreadTable
 
 def build_report_table():
     print("="*60)
     print("STEP 7: Build Report (Top 9)")
     print("="*60)
     
-    with open("data/ranked_spreads.json", "r") as f:
-        data = json.load(f)
+    ranked = SpreadTable.load("data/ranked_spreads.npz")
     
-    spreads = data["ranked_spreads"][:9]
+    # Expand to dicts only for the rows that reach the report
+    spreads = ranked.take(slice(0, 9)).to_dicts(ranked=True)
     
     try:
         from data.stocks import EDGE_REASON
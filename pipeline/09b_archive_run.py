@@ -0,0 +1,42 @@
+"""
+Archive Run
+Copies this run's artifacts into the SQLite run warehouse (data/warehouse.db)
+"""
+import argparse
+import sys
+import os
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from warehouse import WAREHOUSE_PATH, Warehouse
+
+def archive_run(db=WAREHOUSE_PATH, started=None):
+    print("="*60)
+    print("STEP 9B: Archive Run")
+    print("="*60)
+
+    warehouse = Warehouse(db)
+    run_ts = started.isoformat(timespec="seconds") if started else None
+    run_id, archived = warehouse.archive_run("data", run_ts=run_ts, since=started)
+    warehouse.close()
+
+    for name, rows in archived.items():
+        print(f"   {name}: {rows} rows")
+
+    print(f"\n✅ Run {run_id} archived to {db} ({sum(archived.values())} rows)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Archive this run's artifacts in the run warehouse")
+    parser.add_argument("--db", default=WAREHOUSE_PATH, help=f"Warehouse file (default: {WAREHOUSE_PATH})")
+    parser.add_argument(
+        "--started",
+        type=datetime.fromisoformat,
+        help="Pipeline start time (ISO); used as the run timestamp, older artifacts are skipped"
+    )
+    args = parser.parse_args()
+
+    archive_run(db=args.db, started=args.started)
+
+
+if __name__ == "__main__":
+    main()
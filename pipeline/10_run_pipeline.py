@@ -5,10 +5,14 @@ Runs all 15 steps and shows the data cascade
 """
 import subprocess
 import sys
+import os
 import time
 import json
 from datetime import datetime
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from spread_records import SpreadTable
+
 def print_header():
     print("\n" + "="*80)
     print("💎 CREDIT SPREAD FINDER - MASTER PIPELINE")
@@ -64,9 +68,8 @@ def show_flow():
             stocks = ast.literal_eval(content.split("=")[1].split("\n")[0])
             print(f"   ↓ Top Scored: {len(stocks)} selected")
         
-        with open("data/spreads.json", "r") as f:
-            spreads = json.load(f)
-            print(f"\n📈 Spreads Built: {spreads['total_spreads']}")
+        spreads = SpreadTable.load("data/spreads.npz")
+        print(f"\n📈 Spreads Built: {len(spreads)}")
         
         with open("data/ranked_spreads.json", "r") as f:
             ranked = json.load(f)
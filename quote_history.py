@@ -0,0 +1,230 @@
+"""
+Quote History
+Append-only time series of every quote the pipeline fetches
+
+Each quote QuoteSnapshot fetches from Schwab (steps 00B and 01) is
+appended as one fixed-width record to
+
+    data/quote_history/<YYYY-MM-DD>/<TICKER>.bin
+
+partitioned by UTC day of fetched_at. The day directory and file name are
+the per-ticker index: reading a ticker over a time range opens only that
+ticker's files for the days in the range, so cost follows the result, not
+the number of tickers or days stored. Records are raw little-endian
+QUOTE_DTYPE rows; a write interrupted mid-record is ignored on read.
+
+Usage:
+    python quote_history.py AAPL --days 5
+"""
+import argparse
+import math
+import os
+import time
+from datetime import datetime, timedelta
+from dotenv import load_dotenv
+
+import numpy as np
+
+load_dotenv()
+
+HISTORY_DIR = os.getenv("QUOTE_HISTORY_DIR", "data/quote_history")
+
+# One record per fetched quote (48 bytes)
+QUOTE_DTYPE = np.dtype([
+    ("fetched_at", "<f8"),   # epoch seconds
+    ("bid", "<f8"),
+    ("ask", "<f8"),
+    ("last", "<f8"),
+    ("mark", "<f8"),
+    ("volume", "<i8"),
+])
+
+# Schwab quote field -> record field
+FIELD_MAP = (
+    ("bidPrice", "bid"), ("askPrice", "ask"), ("lastPrice", "last"), ("mark", "mark"),
+    ("totalVolume", "volume")
+)
+
+SECONDS_PER_YEAR = 365 * 24 * 3600
+
+
+def day_key(epoch):
+    """UTC partition name for an epoch time, e.g. '2026-01-05'"""
+    return time.strftime("%Y-%m-%d", time.gmtime(epoch))
+
+
+class QuoteHistory:
+    """
+    Per-day, per-ticker binary quote files
+
+    Args:
+        root: History directory
+    """
+
+    def __init__(self, root=HISTORY_DIR):
+        self.root = root
+
+    def _path(self, day, ticker):
+        return os.path.join(self.root, day, ticker.replace(os.sep, "_") + ".bin")
+
+    def append(self, quotes):
+        """
+        Append fetched quotes
+
+        Args:
+            quotes: Ticker to snapshot entry (Schwab QUOTE_FIELDS plus
+                fetched_at), as kept by QuoteSnapshot
+
+        Returns:
+            int: Records written
+        """
+        tickers = list(quotes)
+        records = np.zeros(len(tickers), QUOTE_DTYPE)
+        records["fetched_at"] = [quotes[t]["fetched_at"] for t in tickers]
+        for source, field in FIELD_MAP:
+            records[field] = [quotes[t].get(source) or 0 for t in tickers]
+
+        for ticker, record in zip(tickers, records):
+            path = self._path(day_key(record["fetched_at"]), ticker)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # One O_APPEND write per record, so concurrent steps don't interleave bytes
+            with open(path, "ab") as f:
+                f.write(record.tobytes())
+
+        return len(records)
+
+    def days(self, start=None, end=None):
+        """Stored day partitions overlapping [start, end] (epoch seconds), oldest first"""
+        try:
+            days = sorted(d for d in os.listdir(self.root) if len(d) == 10)
+        except FileNotFoundError:
+            return []
+        first = day_key(start) if start is not None else ""
+        last = day_key(end) if end is not None else "9999"
+        return [d for d in days if first <= d <= last]
+
+    def read(self, ticker, start=None, end=None):
+        """
+        Quotes of one ticker fetched in [start, end]
+
+        Only the ticker's files for days in the range are read.
+
+        Args:
+            ticker: Symbol
+            start: Epoch seconds (None = from the first record)
+            end: Epoch seconds (None = up to the last record)
+
+        Returns:
+            ndarray: QUOTE_DTYPE records sorted by fetched_at
+        """
+        parts = []
+        for day in self.days(start, end):
+            records = self._load(day, ticker)
+            keep = np.ones(len(records), dtype=bool)
+            if start is not None:
+                keep &= records["fetched_at"] >= start
+            if end is not None:
+                keep &= records["fetched_at"] <= end
+            parts.append(np.array(records[keep]))
+
+        if not parts:
+            return np.zeros(0, QUOTE_DTYPE)
+        records = np.concatenate(parts)
+        return records[np.argsort(records["fetched_at"], kind="stable")]
+
+    def latest(self, ticker):
+        """Most recent record of a ticker, or None"""
+        for day in reversed(self.days()):
+            records = self._load(day, ticker)
+            if len(records):
+                return records[np.argmax(records["fetched_at"])]
+        return None
+
+    def _load(self, day, ticker):
+        """Map one day file (whole records only)"""
+        path = self._path(day, ticker)
+        count = os.path.getsize(path) // QUOTE_DTYPE.itemsize if os.path.exists(path) else 0
+        if count == 0:
+            return np.zeros(0, QUOTE_DTYPE)
+        return np.memmap(path, dtype=QUOTE_DTYPE, mode="r", shape=(count,))
+
+
+def mids(records):
+    """Mid prices of records with a two-sided quote (else the mark)"""
+    two_sided = (records["bid"] > 0) & (records["ask"] > 0)
+    return np.where(two_sided, (records["bid"] + records["ask"]) / 2, records["mark"])
+
+
+def realized_volatility(records):
+    """
+    Annualized realized volatility of mid prices
+
+    Sum of squared log returns between consecutive quotes, scaled by
+    calendar time covered (so irregular fetch intervals are allowed).
+
+    Returns:
+        float: Fraction per year, or nan with fewer than 2 usable quotes
+    """
+    prices = mids(records)
+    usable = prices > 0
+    prices, times = prices[usable], records["fetched_at"][usable]
+    span = times[-1] - times[0] if len(times) else 0
+    if len(prices) < 2 or span <= 0:
+        return math.nan
+    returns = np.diff(np.log(prices))
+    return float(np.sqrt(np.sum(returns ** 2) * SECONDS_PER_YEAR / span))
+
+
+def summarize(records, now=None):
+    """
+    Move, range, realized volatility and staleness of a quote series
+
+    Args:
+        records: QUOTE_DTYPE records sorted by fetched_at
+        now: Epoch seconds for staleness (default: current time)
+
+    Returns:
+        dict: quotes, first / last (ISO), first_mid, last_mid, move_pct,
+            range_pct, realized_vol and age_seconds of the last quote
+    """
+    if len(records) == 0:
+        return {"quotes": 0}
+
+    prices = mids(records)
+    first, last = float(prices[0]), float(prices[-1])
+    times = records["fetched_at"]
+    return {
+        "quotes": len(records),
+        "first": datetime.fromtimestamp(times[0]).isoformat(timespec="seconds"),
+        "last": datetime.fromtimestamp(times[-1]).isoformat(timespec="seconds"),
+        "first_mid": round(first, 2),
+        "last_mid": round(last, 2),
+        "move_pct": round((last - first) / first * 100, 2) if first > 0 else None,
+        "range_pct": round(float(prices.max() - prices.min()) / first * 100, 2) if first > 0 else None,
+        "realized_vol": round(realized_volatility(records) * 100, 1),
+        "age_seconds": round((now or time.time()) - float(times[-1]), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize a ticker's recorded quote history")
+    parser.add_argument("ticker")
+    parser.add_argument("--days", type=float, default=1, help="Look back this many days (default: 1)")
+    parser.add_argument("--root", default=HISTORY_DIR, help=f"History directory (default: {HISTORY_DIR})")
+    parser.add_argument("--rows", action="store_true", help="Also print every quote")
+    args = parser.parse_args()
+
+    start = (datetime.now() - timedelta(days=args.days)).timestamp()
+    records = QuoteHistory(args.root).read(args.ticker.upper(), start=start)
+
+    if args.rows:
+        for r in records:
+            print(f"{datetime.fromtimestamp(r['fetched_at']).isoformat(timespec='seconds')}  "
+                  f"bid {r['bid']:.2f}  ask {r['ask']:.2f}  last {r['last']:.2f}  vol {r['volume']}")
+
+    for key, value in summarize(records).items():
+        print(f"{key:>14}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Universe Quote Snapshot
+Fetches Schwab quotes in full-size concurrent batches and keeps a
+timestamped snapshot that later steps reuse while it is fresh
+"""
+import json
+import os
+import time
+from dotenv import load_dotenv
+
+from fetch_engine import FetchEngine
+from quote_history import HISTORY_DIR, QuoteHistory
+
+load_dotenv()
+
+SNAPSHOT_PATH = os.getenv("QUOTE_SNAPSHOT_PATH", "data/quote_snapshot.json")
+
+# Seconds a snapshot quote can be reused by later steps
+MAX_AGE = float(os.getenv("QUOTE_MAX_AGE", "120"))
+
+# Seconds step 00B may reuse snapshot quotes (0 always refetches)
+REFRESH_MAX_AGE = float(os.getenv("QUOTE_REFRESH_MAX_AGE", "0"))
+
+# Schwab accepts up to 500 symbols per quote request
+BATCH_SIZE = 500
+
+# Quote fields kept in the snapshot
+QUOTE_FIELDS = ('bidPrice', 'askPrice', 'lastPrice', 'mark', 'totalVolume')
+
+
+class QuoteSnapshot:
+    """
+    Timestamped quotes for the ticker universe, persisted between steps
+
+    Each entry holds the QUOTE_FIELDS from Schwab plus fetched_at (epoch
+    seconds). refresh() only requests tickers that are missing or older
+    than max_age, and appends every fetched quote to the quote history
+    (quote_history.py) unless history_dir is empty.
+    """
+
+    def __init__(self, path=SNAPSHOT_PATH, max_age=MAX_AGE, history_dir=HISTORY_DIR):
+        self.path = path
+        self.max_age = max_age
+        self.quotes = {}
+        self.history = QuoteHistory(history_dir) if history_dir else None
+
+        try:
+            with open(path, "r") as f:
+                self.quotes = json.load(f)["quotes"]
+        except (FileNotFoundError, ValueError, KeyError):
+            pass
+
+    def is_fresh(self, ticker, now=None):
+        quote = self.quotes.get(ticker)
+        if quote is None:
+            return False
+        now = now or time.time()
+        return now - quote["fetched_at"] <= self.max_age
+
+    def refresh(self, tickers, client=None, batch_size=BATCH_SIZE):
+        """
+        Bring quotes for tickers up to date
+
+        Args:
+            tickers: Symbols to quote
+            client: Schwab client (defaults to the shared client)
+            batch_size: Symbols per request
+
+        Returns:
+            tuple: (quotes, errors, fetched) - quotes maps ticker to snapshot
+                entry for every ticker with data, errors maps ticker to the
+                exception of its failed batch, fetched is the number of
+                tickers requested from the API
+        """
+        now = time.time()
+        current = {t for t in tickers if self.is_fresh(t, now)}
+        stale = [t for t in tickers if t not in current]
+        batches = [stale[i:i + batch_size] for i in range(0, len(stale), batch_size)]
+        errors = {}
+        new_quotes = {}
+
+        if batches:
+            def fetch(client, batch):
+                response = client.get_quotes(','.join(batch))
+                response.raise_for_status()
+                return response.json()
+
+            for batch, data, error in FetchEngine(client).map(fetch, batches):
+                if error is not None:
+                    for ticker in batch:
+                        errors[ticker] = error
+                    continue
+
+                fetched_at = time.time()
+                for ticker in batch:
+                    if ticker in data and 'quote' in data[ticker]:
+                        quote = data[ticker]['quote']
+                        entry = {field: quote.get(field, 0) for field in QUOTE_FIELDS}
+                        entry['fetched_at'] = fetched_at
+                        self.quotes[ticker] = entry
+                        new_quotes[ticker] = entry
+                        current.add(ticker)
+
+            self.save()
+            if self.history is not None and new_quotes:
+                self.history.append(new_quotes)
+
+        quotes = {t: self.quotes[t] for t in tickers if t in current}
+        return quotes, errors, len(stale)
+
+    def save(self):
+        """Write snapshot atomically"""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"updated": time.time(), "quotes": self.quotes}, f)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,177 @@
+"""
+Schwab Rate Limiter
+Token buckets shared by every thread and pipeline process, plus
+429-aware retries around the Schwab client
+"""
+import json
+import os
+import random
+import threading
+import time
+from dotenv import load_dotenv
+
+try:
+    import fcntl
+except ImportError:  # Windows: buckets are shared per process only
+    fcntl = None
+
+load_dotenv()
+
+STATE_PATH = os.getenv("SCHWAB_RATE_STATE", "data/cache/rate_limits.json")
+
+# Requests per minute for each endpoint group
+BUDGETS = {
+    "chains": float(os.getenv("SCHWAB_CHAINS_PER_MIN", "100")),
+    "quotes": float(os.getenv("SCHWAB_QUOTES_PER_MIN", "20")),
+}
+
+MAX_RETRIES = int(os.getenv("SCHWAB_MAX_RETRIES", "5"))
+BASE_BACKOFF = 1.0
+MAX_BACKOFF = 60.0
+
+# Client methods metered by each endpoint group
+ENDPOINTS = {
+    "get_option_chain": "chains",
+    "get_quote": "quotes",
+    "get_quotes": "quotes",
+}
+
+
+class RateLimiter:
+    """
+    Token bucket per endpoint, persisted to a locked state file
+
+    Each bucket holds up to one minute of budget and refills continuously.
+    Because the state lives on disk behind an exclusive lock, concurrent
+    threads and separate pipeline steps draw from the same budget.
+    """
+
+    def __init__(self, budgets=BUDGETS, state_path=STATE_PATH):
+        self.budgets = budgets
+        self.state_path = state_path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(state_path) or ".", exist_ok=True)
+
+    def _update(self, update):
+        """Run update(state) under process and file locks, then persist state"""
+        with self._lock, open(self.state_path, "a+") as f:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.seek(0)
+                try:
+                    state = json.loads(f.read() or "{}")
+                except ValueError:
+                    state = {}
+
+                result = update(state)
+
+                f.seek(0)
+                f.truncate()
+                f.write(json.dumps(state))
+                f.flush()
+                return result
+            finally:
+                if fcntl:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _take(self, endpoint, now):
+        """Consume a token; return seconds to wait if none is available"""
+        capacity = self.budgets[endpoint]
+        rate = capacity / 60.0
+
+        def update(state):
+            bucket = state.setdefault(endpoint, {
+                "tokens": capacity, "updated": now, "blocked_until": 0
+            })
+            if now < bucket["blocked_until"]:
+                return bucket["blocked_until"] - now
+
+            elapsed = max(0.0, now - bucket["updated"])
+            bucket["tokens"] = min(capacity, bucket["tokens"] + elapsed * rate)
+            bucket["updated"] = now
+
+            if bucket["tokens"] >= 1:
+                bucket["tokens"] -= 1
+                return 0.0
+            return (1 - bucket["tokens"]) / rate
+
+        return self._update(update)
+
+    def acquire(self, endpoint):
+        """Block until a request to endpoint is allowed"""
+        if endpoint not in self.budgets:
+            return
+        while True:
+            wait = self._take(endpoint, time.time())
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    def block(self, endpoint, seconds):
+        """Pause an endpoint for every process (e.g. after a 429)"""
+        if endpoint not in self.budgets:
+            return
+        until = time.time() + seconds
+
+        def update(state):
+            bucket = state.setdefault(endpoint, {
+                "tokens": 0, "updated": time.time(), "blocked_until": 0
+            })
+            bucket["tokens"] = 0
+            bucket["blocked_until"] = max(bucket["blocked_until"], until)
+            # Refill from the end of the pause, not from before it
+            bucket["updated"] = max(bucket["updated"], bucket["blocked_until"])
+
+        self._update(update)
+
+
+def retry_after_seconds(response):
+    """Parse Retry-After header (seconds form) from a response"""
+    value = response.headers.get("Retry-After") if response.headers else None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+class RateLimitedClient:
+    """
+    Schwab client wrapper that meters requests and retries throttling
+
+    Metered methods wait for a token before each attempt. On HTTP 429 the
+    endpoint is paused for Retry-After (or jittered exponential backoff)
+    and the request is retried up to MAX_RETRIES times. Other attributes
+    are passed through to the wrapped client.
+    """
+
+    def __init__(self, client, limiter=None, max_retries=MAX_RETRIES):
+        self._client = client
+        self._limiter = limiter or RateLimiter()
+        self._max_retries = max_retries
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        endpoint = ENDPOINTS.get(name)
+        if endpoint is None or not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            for attempt in range(self._max_retries + 1):
+                self._limiter.acquire(endpoint)
+                response = attr(*args, **kwargs)
+
+                if response.status_code != 429 or attempt == self._max_retries:
+                    return response
+
+                backoff = min(MAX_BACKOFF, BASE_BACKOFF * 2 ** attempt)
+                wait = retry_after_seconds(response)
+                if wait is None:
+                    wait = random.uniform(backoff / 2, backoff)
+                else:
+                    wait += random.uniform(0, backoff / 4)
+
+                # Next acquire() waits out the pause
+                self._limiter.block(endpoint, wait)
+
+        return call
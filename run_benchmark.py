@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Spread Stage Benchmark
+Times steps 03, 05, 06 and 07 on synthetic chain snapshots of several
+sizes and checks them against a saved baseline
+
+Each size (tickers x expirations x strikes) gets its own work directory
+with a snapshot from synthetic_chains.py. Every step runs as a subprocess,
+like the pipeline runner; wall time comes from the clock and peak memory
+from the child's rusage (os.wait4). Step 05 throughput is reported as
+candidate (short, long) strike pairs examined per second.
+
+A child's peak RSS starts at the parent's RSS when it is spawned, so this
+process only uses the standard library; snapshots are built and counted
+in a separate worker process.
+
+Usage:
+    python run_benchmark.py --save-baseline data/benchmark_baseline.json
+    python run_benchmark.py --baseline data/benchmark_baseline.json
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Tickers x expirations x strikes
+DEFAULT_SIZES = "10x5x40,40x7x80,100x8x120"
+
+STEPS = [
+    ("03", "pipeline/03_check_liquidity.py"),
+    ("05", "pipeline/05_calculate_spreads.py --full"),
+    ("06", "pipeline/06_rank_spreads.py"),
+    ("07", "pipeline/07_build_report.py"),
+]
+
+# A step regresses when it is this much slower (or larger) than the baseline
+MAX_REGRESSION = 0.25
+
+# Differences below these are treated as noise
+MIN_SECONDS = 0.2
+MIN_MB = 20
+
+
+def parse_size(text):
+    """'40x7x80' -> (40, 7, 80)"""
+    tickers, expirations, strikes = (int(v) for v in text.lower().split("x"))
+    return tickers, expirations, strikes
+
+
+def candidate_pairs(chains):
+    """
+    Vertical (short, long) strike pairs step 05 examines
+
+    Every pair of quoted strikes on one side of an expiration in the step 05
+    DTE window, before any filter.
+    """
+    from spread_engine import MAX_DTE, MIN_DTE, SIDES
+
+    pairs = 0
+    for expirations in chains.values():
+        for exp_data in expirations:
+            if not MIN_DTE <= exp_data["dte"] <= MAX_DTE:
+                continue
+            for side, _, _ in SIDES:
+                n = sum(1 for s in exp_data["strikes"] if f"{side}_bid" in s)
+                pairs += n * (n - 1) // 2
+    return pairs
+
+
+def in_worker(fn, *args):
+    """Call fn in a short-lived worker process"""
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        return pool.submit(fn, *args).result()
+
+
+def prepare_snapshot(data_dir, size, seed):
+    """Write a snapshot and count it (runs in a worker process)"""
+    from synthetic_chains import write_snapshot
+
+    tickers, expirations, strikes = size
+    _, chains = write_snapshot(data_dir, tickers=tickers, expirations=expirations,
+                               strikes=strikes, seed=seed)
+    contracts = sum(len(e["strikes"]) for exps in chains.values() for e in exps) * 2
+    return contracts, candidate_pairs(chains)
+
+
+def count_spreads(path):
+    """Rows in a step 05 spreads.npz (runs in a worker process)"""
+    from spread_records import SpreadTable
+
+    return len(SpreadTable.load(path))
+
+
+def run_timed(script, work_dir, env, workers):
+    """
+    Run one pipeline step and measure it
+
+    Returns:
+        dict: seconds, peak_mb and exit code
+    """
+    args = [sys.executable, *(os.path.join(ROOT, part) if part.endswith(".py") else part
+                              for part in script.split())]
+    if workers != 1 and script.startswith("pipeline/05_"):
+        args += ["--workers", str(workers)]
+
+    with open(os.path.join(work_dir, "benchmark.log"), "a") as log:
+        start = time.perf_counter()
+        proc = subprocess.Popen(args, cwd=work_dir, env=env, stdout=log, stderr=log)
+        _, status, usage = os.wait4(proc.pid, 0)
+        elapsed = time.perf_counter() - start
+    proc.returncode = os.waitstatus_to_exitcode(status)
+
+    # ru_maxrss is KB on Linux, bytes on macOS
+    peak = usage.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    return {"seconds": round(elapsed, 3), "peak_mb": round(peak, 1), "exit_code": proc.returncode}
+
+
+def benchmark_size(size, repeat=1, workers=1, seed=0):
+    """
+    Generate one snapshot and time every step on it
+
+    Args:
+        size: (tickers, expirations, strikes)
+        repeat: Runs per step; the fastest time and largest peak are kept
+        workers: Step 05 worker processes
+        seed: Snapshot seed
+
+    Returns:
+        dict: Snapshot dimensions, per-step timings and step 05 throughput
+    """
+    tickers, expirations, strikes = size
+    work_dir = tempfile.mkdtemp(prefix="spread_bench_")
+    env = {**os.environ, "SPREAD_CACHE_DIR": os.path.join(work_dir, "data", "cache", "spreads")}
+
+    try:
+        contracts, pairs = in_worker(prepare_snapshot, os.path.join(work_dir, "data"), size, seed)
+        result = {
+            "size": f"{tickers}x{expirations}x{strikes}",
+            "contracts": contracts,
+            "pairs": pairs,
+            "steps": {}
+        }
+
+        for name, script in STEPS:
+            runs = [run_timed(script, work_dir, env, workers) for _ in range(repeat)]
+            failed = [r for r in runs if r["exit_code"] != 0]
+            if failed:
+                with open(os.path.join(work_dir, "benchmark.log")) as f:
+                    print(f.read()[-2000:])
+                raise RuntimeError(f"step {name} exited with {failed[0]['exit_code']} on {result['size']}")
+
+            result["steps"][name] = {
+                "seconds": min(r["seconds"] for r in runs),
+                "peak_mb": max(r["peak_mb"] for r in runs)
+            }
+
+        result["spreads"] = in_worker(count_spreads, os.path.join(work_dir, "data", "spreads.npz"))
+        result["pairs_per_sec"] = round(result["pairs"] / max(result["steps"]["05"]["seconds"], 1e-9))
+        return result
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def find_regressions(results, baseline, max_regression=MAX_REGRESSION):
+    """
+    Compare results with a baseline run
+
+    Returns:
+        list: Messages for every step slower or larger than allowed
+    """
+    previous = {r["size"]: r for r in baseline.get("sizes", [])}
+    regressions = []
+
+    for result in results:
+        before = previous.get(result["size"])
+        if before is None:
+            continue
+
+        for name, now in result["steps"].items():
+            then = before["steps"].get(name)
+            if then is None:
+                continue
+            for metric, floor in (("seconds", MIN_SECONDS), ("peak_mb", MIN_MB)):
+                limit = then[metric] * (1 + max_regression)
+                if now[metric] > limit and now[metric] - then[metric] > floor:
+                    regressions.append(
+                        f"{result['size']} step {name} {metric}: {now[metric]} vs baseline {then[metric]}"
+                    )
+
+    return regressions
+
+
+def print_results(results):
+    print(f"\n{'size':>14} {'pairs':>12} {'spreads':>9}  " +
+          "  ".join(f"{name:>14}" for name, _ in STEPS) + f"  {'pairs/sec':>12}")
+    for r in results:
+        steps = "  ".join(f"{r['steps'][n]['seconds']:6.2f}s {r['steps'][n]['peak_mb']:5.0f}MB"
+                          for n, _ in STEPS)
+        print(f"{r['size']:>14} {r['pairs']:>12,} {r['spreads']:>9,}  {steps}  {r['pairs_per_sec']:>12,}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark spread steps 03-07 on synthetic chains")
+    parser.add_argument(
+        "--sizes",
+        default=DEFAULT_SIZES,
+        help=f"Comma-separated TICKERSxEXPIRATIONSxSTRIKES (default: {DEFAULT_SIZES})"
+    )
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per step, best time kept")
+    parser.add_argument("--workers", type=int, default=1, help="Step 05 worker processes")
+    parser.add_argument("--seed", type=int, default=0, help="Synthetic snapshot seed")
+    parser.add_argument("--output", default="data/benchmark.json", help="Results file")
+    parser.add_argument("--baseline", help="Fail if slower/larger than this earlier results file")
+    parser.add_argument(
+        "--max-regression",
+        type=float,
+        default=MAX_REGRESSION,
+        help=f"Allowed slowdown vs baseline as a fraction (default: {MAX_REGRESSION})"
+    )
+    parser.add_argument("--save-baseline", metavar="PATH", help="Also write results as a new baseline")
+    args = parser.parse_args()
+
+    print("="*60)
+    print("BENCHMARK: Spread steps 03, 05, 06, 07")
+    print("="*60)
+
+    results = []
+    for text in args.sizes.split(","):
+        size = parse_size(text)
+        print(f"\n⏱️  {text}...")
+        results.append(benchmark_size(size, repeat=args.repeat, workers=args.workers, seed=args.seed))
+
+    print_results(results)
+
+    output = {
+        "timestamp": datetime.now().isoformat(),
+        "python": sys.version.split()[0],
+        "cpus": os.cpu_count(),
+        "workers": args.workers,
+        "sizes": results
+    }
+    for path in filter(None, (args.output, args.save_baseline)):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(output, f, indent=2)
+    print(f"\n✅ Results saved to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+        regressions = find_regressions(results, baseline, args.max_regression)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s) over {args.max_regression:.0%}:")
+            for message in regressions:
+                print(f"   {message}")
+            sys.exit(1)
+        print(f"✅ No regressions over {args.max_regression:.0%} vs {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
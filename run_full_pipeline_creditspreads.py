@@ -2,18 +2,23 @@
 """
 Master Pipeline Runner - Complete Data Flow
 """
+import argparse
+import os
 import subprocess
 import sys
 import time
 from datetime import datetime
 
+from schwab_client import create_schwab_client
+from schwab_broker import start_broker
+
 def run_step(step_name, script_path, description):
     print("\n" + "="*80)
     print(f"▶ {step_name}: {description}")
     print("="*80)
     
     start = time.time()
-    result = subprocess.run([sys.executable, script_path], text=True)
+    result = subprocess.run([sys.executable, *script_path.split()], text=True)
     elapsed = time.time() - start
     
     if result.returncode == 0:
@@ -23,13 +28,46 @@ def run_step(step_name, script_path, description):
         print(f"\n❌ {step_name} FAILED ({elapsed:.1f}s)")
         return False
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run the full credit spread pipeline")
+    parser.add_argument(
+        "--max-age",
+        type=float,
+        metavar="SECONDS",
+        help="Reuse cached chains and quotes younger than this (e.g. 300 for a quick rerun)"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Worker processes for step 05 spread building (0 = all cores)"
+    )
+    parser.add_argument(
+        "--condors",
+        action="store_true",
+        help="Also build iron condors (step 05B)"
+    )
+    return parser.parse_args()
+
 def main():
+    args = parse_args()
+
+    # Steps read cache freshness from the environment
+    if args.max_age is not None:
+        for var in ("CHAIN_CACHE_MAX_AGE", "QUOTE_MAX_AGE", "QUOTE_REFRESH_MAX_AGE"):
+            os.environ[var] = str(args.max_age)
+
     print("\n" + "█"*80)
     print("█" + "  CREDIT SPREAD FINDER - FULL PIPELINE".center(78) + "█")
     print("█" + f"  {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}".center(78) + "█")
     print("█"*80)
     
     start = time.time()
+    started = datetime.now().isoformat(timespec="seconds")
+
+    # One authenticated client serves every step's Schwab requests
+    host, port = start_broker(create_schwab_client)[0]
+    print(f"\n🔌 Schwab client broker on {host}:{port}")
     
     steps = [
         ("00a", "pipeline/00a_get_sp500.py", "Get S&P 500"),
@@ -39,14 +77,18 @@ def main():
         ("00e", "pipeline/00e_select_22.py", "Select 22"),
         ("00f", "pipeline/00f_get_news.py", "Get News"),
         ("01", "pipeline/01_get_prices_schwab.py", "Get Prices (Schwab)"),
-        ("02", "pipeline/02_get_chains_schwab.py", "Get Chains (Schwab)"),
+        # Step 02 embeds Greeks from the same chain responses, replacing step 04
+        ("02", "pipeline/02_get_chains_schwab.py --with-greeks", "Get Chains + Greeks (Schwab)"),
         ("03", "pipeline/03_check_liquidity.py", "Check Liquidity"),
-        ("04", "pipeline/04_get_greeks_schwab.py", "Get Greeks (Schwab)"),
-        ("05", "pipeline/05_calculate_spreads.py", "Calculate Spreads"),
-        ("06", "pipeline/06_rank_spreads.py", "Rank Spreads"),
+        # Step 05 ranks while it builds, replacing step 06
+        ("05", f"pipeline/05_calculate_spreads.py --rank --workers {args.workers}", "Calculate + Rank Spreads"),
+        *([("05b", f"pipeline/05b_build_condors.py --workers {args.workers}", "Build Iron Condors")]
+          if args.condors else []),
         ("07", "pipeline/07_build_report.py", "Build Report"),
         ("08", "pipeline/08_gpt_analysis.py", "GPT Analysis"),
         ("09", "pipeline/09_format_trades.py", "Format Trades"),
+        # History of this run's artifacts in data/warehouse.db
+        ("09b", f"pipeline/09b_archive_run.py --started {started}", "Archive Run"),
     ]
     
     completed = 0
@@ -0,0 +1,138 @@
+"""
+Schwab Client Broker
+Serves one authenticated, keep-alive Schwab client to every pipeline step
+
+The pipeline runner starts the broker in-process and exports its address
+through environment variables. get_schwab_client() in each child step then
+forwards requests to the broker instead of running auth.easy_client and
+opening fresh TLS connections per step.
+"""
+import os
+import secrets
+import threading
+from multiprocessing.managers import BaseManager
+
+import httpx
+
+ADDRESS_ENV = "SCHWAB_BROKER_ADDRESS"
+AUTHKEY_ENV = "SCHWAB_BROKER_AUTHKEY"
+
+
+class SchwabBroker:
+    """Holds the shared client and runs read-only requests on its behalf"""
+
+    def __init__(self, client_factory):
+        self._client_factory = client_factory
+        self._client = None
+        self._error = None
+        self._lock = threading.Lock()
+
+    def _get_client(self):
+        # Authenticate on first use so the runner never blocks on OAuth
+        with self._lock:
+            if self._client is None and self._error is None:
+                try:
+                    self._client = self._client_factory()
+                except BaseException as e:
+                    # create_schwab_client() exits on auth failure; SystemExit
+                    # would drop the manager connection without a reply, so
+                    # keep it as an ordinary error that is sent to every caller
+                    self._error = RuntimeError(f"Schwab client authentication failed: {e!r}")
+            if self._error is not None:
+                raise self._error
+            return self._client
+
+    def request(self, method, args, kwargs):
+        """
+        Call a market data method on the shared client
+
+        Returns:
+            tuple: (status_code, headers, content, request_method, request_url)
+        """
+        if not method.startswith("get_"):
+            raise ValueError(f"Method not allowed through broker: {method}")
+
+        response = getattr(self._get_client(), method)(*args, **kwargs)
+        return (
+            response.status_code,
+            list(response.headers.items()),
+            response.content,
+            response.request.method,
+            str(response.request.url)
+        )
+
+
+class BrokerManager(BaseManager):
+    pass
+
+
+def start_broker(client_factory):
+    """
+    Start the broker on a background thread and export its address
+
+    Args:
+        client_factory: Callable returning an authenticated Schwab client
+
+    Returns:
+        tuple: (address, authkey) the broker listens on
+    """
+    broker = SchwabBroker(client_factory)
+    BrokerManager.register("broker", callable=lambda: broker)
+
+    authkey = secrets.token_bytes(16)
+    manager = BrokerManager(address=("127.0.0.1", 0), authkey=authkey)
+    server = manager.get_server()
+
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    host, port = server.address
+    os.environ[ADDRESS_ENV] = f"{host}:{port}"
+    os.environ[AUTHKEY_ENV] = authkey.hex()
+    return server.address, authkey
+
+
+class BrokerClient:
+    """
+    Client-side stand-in for schwab.client.Client
+
+    Every get_* method call is forwarded to the broker and rebuilt into an
+    httpx.Response, so callers keep using raise_for_status() and json().
+    """
+
+    def __init__(self, address, authkey):
+        BrokerManager.register("broker")
+        self._manager = BrokerManager(address=address, authkey=authkey)
+        self._manager.connect()
+        self._broker = self._manager.broker()
+
+    def __getattr__(self, name):
+        if not name.startswith("get_"):
+            raise AttributeError(name)
+
+        def call(*args, **kwargs):
+            status_code, headers, content, method, url = self._broker.request(name, args, kwargs)
+            return httpx.Response(
+                status_code,
+                headers=headers,
+                content=content,
+                request=httpx.Request(method, url)
+            )
+
+        return call
+
+
+def connect_broker():
+    """
+    Connect to the broker exported by the pipeline runner
+
+    Returns:
+        BrokerClient: Connected client, or None if no broker is configured
+    """
+    address = os.getenv(ADDRESS_ENV)
+    authkey = os.getenv(AUTHKEY_ENV)
+    if not address or not authkey:
+        return None
+
+    host, port = address.rsplit(":", 1)
+    return BrokerClient((host, int(port)), bytes.fromhex(authkey))
@@ -4,15 +4,52 @@ Centralizes authentication and provides reusable client instances
 """
 import os
 import sys
+import threading
 from dotenv import load_dotenv
 from schwab import auth
+from rate_limiter import RateLimitedClient
+from schwab_broker import connect_broker
 
 load_dotenv()
 
+_client = None
+_client_lock = threading.Lock()
+
 
 def get_schwab_client():
     """
-    Create and return authenticated Schwab HTTP client
+    Return the process-wide authenticated Schwab client
+
+    The client is created once per process and reused, keeping its HTTP
+    connections alive. When the pipeline runner exports a client broker,
+    requests go through the runner's client instead, so authentication and
+    TLS setup happen once per run. Requests are metered by a rate limiter
+    shared across threads and pipeline processes, and throttled (429)
+    requests are retried.
+
+    Returns:
+        RateLimitedClient: Authenticated Schwab API client wrapper
+
+    Raises:
+        SystemExit: If required environment variables are missing
+    """
+    global _client
+
+    with _client_lock:
+        if _client is None:
+            client = None
+            try:
+                client = connect_broker()
+            except Exception as e:
+                print(f"⚠️ Schwab broker unavailable ({e}), authenticating directly")
+
+            _client = RateLimitedClient(client or create_schwab_client())
+        return _client
+
+
+def create_schwab_client():
+    """
+    Create a new authenticated Schwab HTTP client
 
     Returns:
         schwab.client.Client: Authenticated Schwab API client
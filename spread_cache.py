@@ -0,0 +1,87 @@
+"""
+Spread Cache
+Per-ticker step 05 output keyed on a fingerprint of the ticker's inputs,
+so unchanged tickers are spliced into step 05 output instead of rebuilt
+"""
+import hashlib
+import json
+import os
+from dotenv import load_dotenv
+
+import numpy as np
+
+from spread_records import SpreadTable
+
+load_dotenv()
+
+CACHE_DIR = os.getenv("SPREAD_CACHE_DIR", "data/cache/spreads")
+
+
+def fingerprint(*parts):
+    """
+    Hash spread inputs into a stable fingerprint
+
+    Args:
+        *parts: NumPy arrays or JSON-serializable values
+
+    Returns:
+        str: Hex digest of all parts
+    """
+    digest = hashlib.sha1()
+    for part in parts:
+        if isinstance(part, np.ndarray):
+            digest.update(str(part.shape).encode())
+            digest.update(np.ascontiguousarray(part).tobytes())
+        else:
+            digest.update(json.dumps(part, sort_keys=True).encode())
+        digest.update(b"|")
+    return digest.hexdigest()
+
+
+class SpreadCache:
+    """
+    Last computed spreads per ticker, with the fingerprint they were built from
+
+    Each ticker's SpreadTable is stored as data/cache/spreads/<TICKER>.npz.
+    A lookup only hits when the stored fingerprint matches the current one.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, reuse=True):
+        self.cache_dir = cache_dir
+        self.reuse = reuse
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, ticker):
+        return os.path.join(self.cache_dir, ticker.replace(os.sep, "_") + ".npz")
+
+    def get(self, ticker, fp):
+        """
+        Look up cached spreads for a ticker
+
+        Args:
+            ticker: Underlying symbol
+            fp: Fingerprint of the ticker's current inputs
+
+        Returns:
+            SpreadTable: Cached spreads, or None if missing or built from other inputs
+        """
+        spreads = None
+        if self.reuse:
+            try:
+                with np.load(self._path(ticker)) as entry:
+                    if str(entry["fingerprint"]) == fp:
+                        spreads = SpreadTable.from_arrays(entry)
+            except (FileNotFoundError, ValueError, KeyError, OSError):
+                pass
+
+        if spreads is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return spreads
+
+    def put(self, ticker, fp, spreads):
+        """Store a ticker's SpreadTable with the fingerprint of its inputs"""
+        spreads.save(self._path(ticker), fingerprint=np.array(fp))
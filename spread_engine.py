@@ -0,0 +1,570 @@
+"""
+Credit Spread Engine
+Vectorized Bull Put / Bear Call construction for step 05
+
+Each expiration's strikes are loaded into NumPy arrays once, candidate
+(short, long) pairs are built with broadcasting, and the credit, width,
+ROI, PoP and delta filters are applied as masks. Output matches the
+original nested-loop implementation row for row.
+"""
+import math
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+from scipy.special import ndtr
+
+from spread_cache import fingerprint
+from spread_ranking import TopK
+from spread_records import SIM_FIELDS, SPREAD_DTYPE, SpreadTable, py_round
+
+# Spread filters
+MIN_DTE = 7
+MAX_DTE = 45
+MIN_SHORT_DELTA = 0.15
+MAX_SHORT_DELTA = 0.35
+MIN_NET_CREDIT = 0.10
+MIN_ROI = 5
+MAX_ROI = 50
+MIN_POP = 60
+
+# Filter set threaded through the builders (threshold sweeps pass their own)
+SpreadFilters = namedtuple("SpreadFilters", [
+    "min_short_delta", "max_short_delta", "min_net_credit", "min_roi", "max_roi", "min_pop"
+])
+DEFAULT_FILTERS = SpreadFilters(MIN_SHORT_DELTA, MAX_SHORT_DELTA, MIN_NET_CREDIT, MIN_ROI, MAX_ROI, MIN_POP)
+
+# Widest spread to consider (None = no limit)
+MAX_WIDTH = None
+
+RISK_FREE_RATE = 0.05
+
+# Spread sides: (field prefix, spread type, is_call)
+SIDES = (("put", "Bull Put", False), ("call", "Bear Call", True))
+
+# Per-side columns of a packed strike matrix
+PACK_FIELDS = ("bid", "ask", "has_greeks", "delta", "iv")
+
+# Packed tickers that are row ranges of one memory-mapped matrix file
+# (chain_arrays.py): .npy path, the parent's mapping and each ticker's first row
+MatrixFile = namedtuple("MatrixFile", ["path", "matrix", "offsets"])
+
+# Rounding ROI, PoP and the score moves a score by at most ~0.125 from
+# roi * pop / 100; rows further than this below the k-th best cannot rank
+SCORE_MARGIN = 0.5
+
+# Bump when spread logic changes so cached per-ticker output is rebuilt
+ENGINE_VERSION = 2
+
+
+def black_scholes_pops(stock_price, strikes, dte, ivs, is_call):
+    """
+    Black-Scholes probability of profit for the strikes of one expiration
+
+    PoP is the risk-neutral probability that the short strike expires out
+    of the money: N(d2) for puts, N(-d2) for calls.
+
+    Args:
+        stock_price: Underlying price
+        strikes: Array of strikes
+        dte: Days to expiration
+        ivs: Array of implied volatilities (fractional)
+        is_call: True for calls, False for puts
+
+    Returns:
+        ndarray: PoP in percent per strike (0 where IV is not positive)
+    """
+    strikes = np.asarray(strikes, dtype=float)
+    ivs = np.asarray(ivs, dtype=float)
+    pops = np.zeros(len(strikes))
+
+    valid = ivs > 0
+    if dte <= 0 or not valid.any():
+        return pops
+
+    T = dte / 365.0
+    r = RISK_FREE_RATE
+    iv = ivs[valid]
+
+    d1 = (np.log(stock_price / strikes[valid]) + (r + 0.5 * iv**2) * T) / (iv * math.sqrt(T))
+    d2 = d1 - iv * math.sqrt(T)
+
+    # One CDF call for the whole expiration side
+    pops[valid] = ndtr(-d2 if is_call else d2) * 100
+    return pops
+
+
+def pack_ticker(expirations):
+    """
+    Pack a ticker's tradable expirations into one float matrix
+
+    Rows are strikes (expirations stacked in order); columns are strike
+    followed by PACK_FIELDS for puts, then for calls. This is the compact
+    form handed to worker processes instead of the strike dicts.
+
+    Args:
+        expirations: Expiration list from chains_with_greeks.json
+
+    Returns:
+        tuple: (matrix, layout) - layout lists (position in expirations,
+            dte, first row, end row) for each expiration within DTE range
+    """
+    rows = []
+    layout = []
+
+    for pos, exp_data in enumerate(expirations):
+        dte = exp_data["dte"]
+
+        if dte < MIN_DTE or dte > MAX_DTE:
+            continue
+
+        start = len(rows)
+        for s in exp_data["strikes"]:
+            row = [s["strike"]]
+            for side, _, _ in SIDES:
+                greeks_key = f"{side}_greeks"
+                has_greeks = greeks_key in s
+                row += (
+                    s.get(f"{side}_bid", 0),
+                    s.get(f"{side}_ask", 0),
+                    has_greeks,
+                    abs(s[greeks_key]["delta"]) if has_greeks else 0.0,
+                    s[greeks_key]["iv"] if has_greeks else 0.0,
+                )
+            rows.append(row)
+        layout.append((pos, dte, start, len(rows)))
+
+    matrix = np.array(rows, dtype=float).reshape(len(rows), 1 + len(SIDES) * len(PACK_FIELDS))
+    return matrix, layout
+
+
+def side_arrays(block, side_no):
+    """
+    View one side of a packed expiration as named arrays
+
+    Args:
+        block: Rows of a packed matrix for one expiration
+        side_no: Index into SIDES
+
+    Returns:
+        dict: strike, bid, ask, has_greeks, delta (absolute) and iv arrays
+    """
+    offset = 1 + side_no * len(PACK_FIELDS)
+    arrays = {"strike": block[:, 0]}
+    for k, field in enumerate(PACK_FIELDS):
+        arrays[field] = block[:, offset + k]
+    arrays["has_greeks"] = arrays["has_greeks"] != 0
+    return arrays
+
+
+def delta_band(arrays, is_call, filters=DEFAULT_FILTERS):
+    """
+    Find short-leg candidates by binary search on delta
+
+    Within an expiration |delta| rises with strike for puts and falls for
+    calls, so the strikes inside the short delta band form one contiguous
+    run of the strikes that have Greeks.
+
+    Args:
+        arrays: Output of side_arrays
+        is_call: True for calls, False for puts
+        filters: SpreadFilters with the delta band
+
+    Returns:
+        ndarray: Strike indices in the delta band with a positive bid, or
+            None if delta is not monotonic (callers fall back to a full scan)
+    """
+    idx = np.flatnonzero(arrays["has_greeks"])
+    key = -arrays["delta"][idx] if is_call else arrays["delta"][idx]
+
+    if np.isnan(key).any() or np.any(key[1:] < key[:-1]):
+        return None
+
+    if is_call:
+        lo = np.searchsorted(key, -filters.max_short_delta, side="left")
+        hi = np.searchsorted(key, -filters.min_short_delta, side="right")
+    else:
+        lo = np.searchsorted(key, filters.min_short_delta, side="left")
+        hi = np.searchsorted(key, filters.max_short_delta, side="right")
+
+    band = idx[lo:hi]
+    return band[~(arrays["bid"][band] <= 0)]
+
+
+def build_verticals(arrays, stock_price, dte, is_call, max_width=MAX_WIDTH, filters=DEFAULT_FILTERS):
+    """
+    Build all qualifying verticals for one side of an expiration
+
+    Bull Puts sell strike i and buy a lower-index strike j < i; Bear Calls
+    sell strike i and buy a higher-index strike j > i.
+
+    Args:
+        arrays: Output of side_arrays
+        stock_price: Underlying price
+        dte: Days to expiration
+        is_call: True for Bear Calls, False for Bull Puts
+        max_width: Skip spreads wider than this (None = no limit)
+        filters: SpreadFilters to apply (defaults to the step 05 filters)
+
+    Returns:
+        dict: Arrays short_idx, long_idx, width, net_credit, max_loss, roi,
+            pop, in the original loop order (short ascending, then long)
+    """
+    strike = arrays["strike"]
+    bid = arrays["bid"]
+    ask = arrays["ask"]
+    has = arrays["has_greeks"]
+    delta = arrays["delta"]
+
+    short_idx = delta_band(arrays, is_call, filters)
+    if short_idx is None:
+        # Written as negated reject conditions so NaNs behave like the scalar checks
+        short_ok = has & ~((delta < filters.min_short_delta) | (delta > filters.max_short_delta)) & ~(bid <= 0)
+        short_idx = np.flatnonzero(short_ok)
+
+    long_ok = has & ~(ask <= 0)
+    if max_width is not None and len(short_idx):
+        # Only strikes within max_width of the band can be long legs
+        short_strikes = strike[short_idx]
+        long_ok &= (strike >= short_strikes.min() - max_width) & (strike <= short_strikes.max() + max_width)
+    long_idx = np.flatnonzero(long_ok)
+
+    if len(short_idx) == 0 or len(long_idx) == 0:
+        empty = np.empty(0)
+        return {"short_idx": np.empty(0, dtype=int), "long_idx": np.empty(0, dtype=int),
+                "width": empty, "net_credit": empty, "max_loss": empty, "roi": empty, "pop": empty}
+
+    # Candidate matrix: rows are short legs, columns are long legs
+    if is_call:
+        order = long_idx[None, :] > short_idx[:, None]
+        width = strike[long_idx][None, :] - strike[short_idx][:, None]
+    else:
+        order = long_idx[None, :] < short_idx[:, None]
+        width = strike[short_idx][:, None] - strike[long_idx][None, :]
+
+    net_credit = bid[short_idx][:, None] - ask[long_idx][None, :]
+
+    mask = order & ~((net_credit <= filters.min_net_credit) | (width <= 0))
+    if max_width is not None:
+        mask &= width <= max_width
+    rows, cols = np.nonzero(mask)
+
+    width = width[rows, cols]
+    net_credit = net_credit[rows, cols]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        max_loss = width - net_credit
+        roi = (net_credit / max_loss) * 100
+
+    # PoP depends only on the short leg: compute per strike, index per pair
+    short_pop = black_scholes_pops(stock_price, strike[short_idx], dte, arrays["iv"][short_idx], is_call)
+    pop = short_pop[rows]
+
+    keep = (roi >= filters.min_roi) & (roi <= filters.max_roi) & (pop >= filters.min_pop)
+
+    return {
+        "short_idx": short_idx[rows[keep]],
+        "long_idx": long_idx[cols[keep]],
+        "width": width[keep],
+        "net_credit": net_credit[keep],
+        "max_loss": max_loss[keep],
+        "roi": roi[keep],
+        "pop": pop[keep],
+    }
+
+
+def ticker_verticals(matrix, layout, stock_price, max_width=MAX_WIDTH, filters=DEFAULT_FILTERS):
+    """
+    Build verticals for every expiration and side of one packed ticker
+
+    Args:
+        matrix: Packed strike matrix (see pack_ticker)
+        layout: Expiration layout rows for this ticker
+        stock_price: Underlying mid price
+        max_width: Skip spreads wider than this (None = no limit)
+        filters: SpreadFilters to apply
+
+    Returns:
+        list: build_verticals output per (expiration, side), in layout order
+            with puts before calls
+    """
+    results = []
+    for _, dte, start, stop in layout:
+        block = matrix[start:stop]
+        for side_no, (_, _, is_call) in enumerate(SIDES):
+            arrays = side_arrays(block, side_no)
+            results.append(build_verticals(arrays, stock_price, dte, is_call, max_width, filters))
+    return results
+
+
+def emit_records(ticker, expirations, stock_price, matrix, layout, results, select=None):
+    """
+    Turn verticals into a compact spread table
+
+    Args:
+        ticker: Underlying symbol
+        expirations: Expiration list the matrix was packed from
+        stock_price: Underlying mid price
+        matrix: Packed strike matrix
+        layout: Expiration layout rows for this ticker
+        results: ticker_verticals output
+        select: Sorted array of row numbers (across all results) to emit;
+            None emits every row
+
+    Returns:
+        SpreadTable: Spreads in the original nested-loop order, rounded as
+            in the step 05 output
+    """
+    parts = []
+    dates = []
+    price = round(stock_price, 2)
+    results = iter(results)
+    base = 0
+
+    for pos, dte, start, stop in layout:
+        date_code = len(dates)
+        dates.append(expirations[pos]["expiration_date"])
+        block = matrix[start:stop]
+
+        for side_no in range(len(SIDES)):
+            verticals = next(results)
+            count = len(verticals["roi"])
+            if select is None:
+                local = slice(None)
+            else:
+                local = select[(select >= base) & (select < base + count)] - base
+            base += count
+
+            i = verticals["short_idx"][local]
+            j = verticals["long_idx"][local]
+            arrays = side_arrays(block, side_no)
+
+            records = np.zeros(len(i), SPREAD_DTYPE)
+            records["type"] = side_no
+            records["expiration"] = date_code
+            records["dte"] = dte
+            records["stock_price"] = price
+            records["short_strike"] = arrays["strike"][i]
+            records["long_strike"] = arrays["strike"][j]
+            records["width"] = py_round(verticals["width"][local], 2)
+            records["net_credit"] = py_round(verticals["net_credit"][local], 2)
+            records["max_loss"] = py_round(verticals["max_loss"][local], 2)
+            records["roi"] = py_round(verticals["roi"][local], 1)
+            records["pop"] = py_round(verticals["pop"][local], 1)
+            records["short_iv"] = py_round(arrays["iv"][i] * 100, 1)
+            records["short_delta"] = py_round(arrays["delta"][i], 2)
+            for name in SIM_FIELDS:
+                records[name] = np.nan
+            parts.append(records)
+
+    records = np.concatenate(parts) if parts else None
+    return SpreadTable(records, [ticker], dates)
+
+
+def top_records(ticker, expirations, stock_price, matrix, layout, results, k):
+    """
+    Emit only a ticker's k best spreads by score, best first
+
+    Rows are pre-screened on the unrounded roi * pop / 100, so exact
+    scores (as spread_scores computes them from the rounded fields) are
+    only computed for rows that can still make the top k. Ties keep output
+    order, as in a stable sort of the full list.
+
+    Args:
+        ticker: Underlying symbol
+        expirations: Expiration list the matrix was packed from
+        stock_price: Underlying mid price
+        matrix: Packed strike matrix
+        layout: Expiration layout rows for this ticker
+        results: ticker_verticals output
+        k: Spreads to keep
+
+    Returns:
+        SpreadTable: Up to k spreads, best first
+    """
+    roi = np.concatenate([r["roi"] for r in results]) if results else np.empty(0)
+    pop = np.concatenate([r["pop"] for r in results]) if results else np.empty(0)
+    if len(roi) == 0:
+        return SpreadTable(tickers=[ticker])
+
+    raw = roi * pop / 100
+    kth = np.partition(raw, len(raw) - k)[len(raw) - k] if k < len(raw) else raw.min()
+    candidates = np.flatnonzero(raw >= kth - SCORE_MARGIN)
+
+    best = TopK(k)
+    for row, r, p in zip(candidates.tolist(), roi[candidates].tolist(), pop[candidates].tolist()):
+        best.push(round((round(r, 1) * round(p, 1)) / 100, 1), row)
+
+    rows = best.items()
+    table = emit_records(ticker, expirations, stock_price, matrix, layout, results,
+                         select=np.array(sorted(rows)))
+    # Emitted in row order; reorder best first
+    position = {row: n for n, row in enumerate(sorted(rows))}
+    return table.take([position[row] for row in rows])
+
+
+# Worker-side mapping of the shared or memory-mapped strike matrix
+_worker_shm = None
+_worker_matrix = None
+
+
+def _attach_matrix(name, shape):
+    """Pool initializer: map the parent's shared strike matrix"""
+    global _worker_shm, _worker_matrix
+    _worker_shm = shared_memory.SharedMemory(name=name)
+    _worker_matrix = np.ndarray(shape, dtype=float, buffer=_worker_shm.buf)
+
+
+def _map_matrix(path):
+    """Pool initializer: memory-map the packed matrix file (stored column by column)"""
+    global _worker_matrix
+    _worker_matrix = np.load(path, mmap_mode="r").T
+
+
+def _worker_verticals(task):
+    layout, stock_price, max_width = task
+    return ticker_verticals(_worker_matrix, layout, stock_price, max_width)
+
+
+def spreads_fingerprint(expirations, stock_price, matrix, layout, max_width=MAX_WIDTH, top_k=None):
+    """
+    Fingerprint everything a ticker's spreads depend on
+
+    Covers the packed quotes and Greeks, expiration dates and DTEs, the
+    underlying price and the engine settings.
+
+    Returns:
+        str: Hex digest
+    """
+    dates = [expirations[pos]["expiration_date"] for pos, _, _, _ in layout]
+    settings = [
+        ENGINE_VERSION, MIN_DTE, MAX_DTE, MIN_SHORT_DELTA, MAX_SHORT_DELTA,
+        MIN_NET_CREDIT, MIN_ROI, MAX_ROI, MIN_POP, RISK_FREE_RATE, max_width, top_k
+    ]
+    return fingerprint(matrix, [list(row) for row in layout], dates, stock_price, settings)
+
+
+def all_spreads(chains, prices, workers=1, max_width=MAX_WIDTH, cache=None, top_k=None, packed=None,
+                mapped=None):
+    """
+    Build spreads for every priced ticker, optionally on a process pool
+
+    Tickers are packed into compact strike matrices first. With a cache,
+    tickers whose input fingerprint is unchanged reuse their previous
+    spreads and only the rest are rebuilt. Output does not depend on the
+    number of workers or on which tickers came from the cache.
+
+    Args:
+        chains: Ticker to expiration list from chains_with_greeks.json
+        prices: Ticker to price record from stock_prices.json
+        workers: Worker processes (1 runs in-process, 0 uses every core)
+        max_width: Skip spreads wider than this (None = no limit)
+        cache: SpreadCache for incremental runs (None rebuilds everything)
+        top_k: Keep only each ticker's k best spreads by score, best first
+            (None keeps every spread in output order)
+        packed: Ticker to (matrix, layout) already packed, e.g. by
+            chain_store.pack_frame(); chains then only needs each
+            expiration's "expiration_date"
+        mapped: MatrixFile the packed matrices are slices of; worker
+            processes map it instead of copying into shared memory
+
+    Returns:
+        dict: Ticker to SpreadTable in chains order, for tickers with a price
+    """
+    tickers = [t for t in chains if t in prices]
+    if packed is None:
+        packed = {t: pack_ticker(chains[t]) for t in tickers}
+
+    spreads = {}
+    fingerprints = {}
+    stale = []
+
+    # Full and top-k results are cached side by side so modes don't evict each other
+    def entry(ticker):
+        return ticker if top_k is None else f"{ticker}.top{top_k}"
+
+    for ticker in tickers:
+        if cache is not None:
+            matrix, layout = packed[ticker]
+            fp = spreads_fingerprint(chains[ticker], prices[ticker]["mid"], matrix, layout, max_width, top_k)
+            fingerprints[ticker] = fp
+            cached = cache.get(entry(ticker), fp)
+            if cached is not None:
+                spreads[ticker] = cached
+                continue
+        stale.append(ticker)
+
+    built = _build_spreads(stale, packed, chains, prices, workers, max_width, top_k, mapped)
+
+    if cache is not None:
+        for ticker in stale:
+            cache.put(entry(ticker), fingerprints[ticker], built[ticker])
+
+    spreads.update(built)
+    return {t: spreads[t] for t in tickers}
+
+
+def _build_spreads(tickers, packed, chains, prices, workers, max_width, top_k, mapped=None):
+    """Build spreads for packed tickers in-process or on a process pool"""
+    workers = workers or os.cpu_count() or 1
+
+    def emit(ticker, stock_price, matrix, layout, results):
+        if top_k is None:
+            return emit_records(ticker, chains[ticker], stock_price, matrix, layout, results)
+        return top_records(ticker, chains[ticker], stock_price, matrix, layout, results, top_k)
+
+    if workers <= 1 or len(tickers) <= 1:
+        spreads = {}
+        for ticker in tickers:
+            matrix, layout = packed[ticker]
+            stock_price = prices[ticker]["mid"]
+            results = ticker_verticals(matrix, layout, stock_price, max_width)
+            spreads[ticker] = emit(ticker, stock_price, matrix, layout, results)
+        return spreads
+
+    if mapped is not None:
+        # Workers map the same file; layouts point into the whole matrix
+        tasks = [
+            ([(pos, dte, start + mapped.offsets[t], stop + mapped.offsets[t])
+              for pos, dte, start, stop in packed[t][1]], prices[t]["mid"], max_width)
+            for t in tickers
+        ]
+        return _run_pool(tickers, tasks, mapped.matrix, emit, workers, _map_matrix, (mapped.path,))
+
+    total_rows = sum(len(packed[t][0]) for t in tickers)
+    shape = (total_rows, 1 + len(SIDES) * len(PACK_FIELDS))
+
+    shm = shared_memory.SharedMemory(create=True, size=max(1, total_rows * shape[1] * 8))
+    try:
+        shared = np.ndarray(shape, dtype=float, buffer=shm.buf)
+
+        # Copy each ticker into its slice and shift its layout to match
+        tasks = []
+        offset = 0
+        for ticker in tickers:
+            matrix, layout = packed[ticker]
+            shared[offset:offset + len(matrix)] = matrix
+            layout = [(pos, dte, start + offset, stop + offset) for pos, dte, start, stop in layout]
+            tasks.append((layout, prices[ticker]["mid"], max_width))
+            offset += len(matrix)
+
+        spreads = _run_pool(tickers, tasks, shared, emit, workers, _attach_matrix, (shm.name, shape))
+        del shared
+        return spreads
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def _run_pool(tickers, tasks, matrix, emit, workers, initializer, initargs):
+    """Run verticals tasks on a pool whose workers see matrix via initializer"""
+    chunksize = max(1, len(tasks) // (workers * 4))
+    with ProcessPoolExecutor(workers, initializer=initializer, initargs=initargs) as pool:
+        results = list(pool.map(_worker_verticals, tasks, chunksize=chunksize))
+
+    return {
+        ticker: emit(ticker, task[1], matrix, task[0], result)
+        for ticker, task, result in zip(tickers, tasks, results)
+    }
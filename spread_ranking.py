@@ -0,0 +1,142 @@
+"""
+Spread Ranking
+Score, decision and best-per-ticker selection shared by steps 05 and 06
+"""
+import heapq
+from datetime import datetime
+
+import numpy as np
+
+from spread_records import DECISIONS, py_round
+
+# ENTER needs PoP≥70% and ROI≥20%, WATCH PoP≥60% and ROI≥30%
+DECISION_RULES = {"enter_pop": 70, "enter_roi": 20, "watch_pop": 60, "watch_roi": 30}
+
+
+def spread_scores(records):
+    """Score = (ROI × PoP) / 100 for every record"""
+    return py_round((records["roi"] * records["pop"]) / 100, 1)
+
+
+def spread_decisions(records, rules=DECISION_RULES):
+    """DECISIONS index per record: ENTER, WATCH or SKIP under the given rules"""
+    pop = records["pop"]
+    roi = records["roi"]
+    enter = (pop >= rules["enter_pop"]) & (roi >= rules["enter_roi"])
+    watch = ~enter & (pop >= rules["watch_pop"]) & (roi >= rules["watch_roi"])
+    return np.where(enter, DECISIONS.index("ENTER"),
+                    np.where(watch, DECISIONS.index("WATCH"), DECISIONS.index("SKIP")))
+
+
+class TopK:
+    """
+    Bounded selection of the best items by score
+
+    Ties go to the item pushed first, matching a stable sort by score
+    descending. k=None keeps every item.
+    """
+
+    def __init__(self, k=None):
+        self.k = k
+        self._heap = []
+        self._pushed = 0
+
+    def push(self, score, item):
+        # Min-heap on (score, -arrival): the root is the current worst item
+        entry = (score, -self._pushed, item)
+        self._pushed += 1
+
+        if self.k is None or len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+        elif entry[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, entry)
+
+    def items(self):
+        """Items best first"""
+        return [item for _, _, item in sorted(self._heap, key=lambda e: (-e[0], -e[1]))]
+
+    def __len__(self):
+        return len(self._heap)
+
+
+def rank_spreads(table, per_ticker=1, top_n=None, rules=DECISION_RULES, scores=None):
+    """
+    Keep the best spreads per ticker, then rank them
+
+    Equivalent to a stable sort by score descending followed by keeping
+    the first per_ticker spreads of each ticker.
+
+    Args:
+        table: SpreadTable of candidate spreads
+        per_ticker: Spreads kept per ticker
+        top_n: Spreads kept overall (None = every ticker's best)
+        rules: ENTER/WATCH thresholds (see DECISION_RULES)
+        scores: Precomputed spread_scores(table.records), if available
+
+    Returns:
+        SpreadTable: Ranked spreads, best first, with score, decision and rank set
+    """
+    records = table.records
+    count = len(records)
+    if scores is None:
+        scores = spread_scores(records)
+
+    # Best first; equal scores keep their original order
+    order = np.lexsort((np.arange(count), -scores))
+
+    # Position of each row among its ticker's rows in that order
+    tickers = records["ticker"][order]
+    by_ticker = np.argsort(tickers, kind="stable")
+    group_start = np.r_[True, tickers[by_ticker][1:] != tickers[by_ticker][:-1]] if count else np.zeros(0, bool)
+    starts = np.flatnonzero(group_start)
+    position = np.empty(count, dtype=np.int64)
+    position[by_ticker] = np.arange(count) - np.repeat(starts, np.diff(np.r_[starts, count]))
+
+    keep = order[position < per_ticker]
+    if top_n is not None:
+        keep = keep[:top_n]
+
+    ranked = table.take(keep)
+    ranked.records["score"] = scores[keep]
+    ranked.records["decision"] = spread_decisions(ranked.records, rules)
+    ranked.records["rank"] = np.arange(1, len(keep) + 1)
+    return ranked
+
+
+def ranked_output(ranked):
+    """
+    Build the ranked_spreads.json document
+
+    Args:
+        ranked: Ranked spread dicts (SpreadTable.to_dicts(ranked=True))
+    """
+    enter = [s for s in ranked if s["decision"] == "ENTER"]
+    watch = [s for s in ranked if s["decision"] == "WATCH"]
+    skip = [s for s in ranked if s["decision"] == "SKIP"]
+
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "summary": {
+            "total": len(ranked),
+            "enter": len(enter),
+            "watch": len(watch),
+            "skip": len(skip)
+        },
+        "ranked_spreads": ranked,
+        "enter_trades": enter,
+        "watch_list": watch
+    }
+
+
+def print_ranking(output):
+    """Print decision counts and the top 9 spreads"""
+    summary = output["summary"]
+    print(f"\n📊 Results (1 per ticker):")
+    print(f"   🟢 ENTER: {summary['enter']}")
+    print(f"   🟡 WATCH: {summary['watch']}")
+    print(f"   🔴 SKIP: {summary['skip']}")
+
+    print(f"\n🎯 Top 9 Spreads:")
+    for spread in output["ranked_spreads"][:9]:
+        print(f"   #{spread['rank']}: {spread['ticker']} {spread['type']} ${spread['short_strike']:.0f}/${spread['long_strike']:.0f}")
+        print(f"        Score: {spread['score']} | ROI: {spread['roi']}% | PoP: {spread['pop']}%")
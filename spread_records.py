@@ -0,0 +1,251 @@
+"""
+Spread Records
+Compact columnar storage for spreads passed between steps 05-07
+
+Spreads live in one NumPy structured array (about 125 bytes per row) with
+ticker symbols and expiration dates interned in side tables. Dicts and
+JSON are only produced at the report edge via SpreadTable.to_dicts().
+"""
+import io
+import os
+
+import numpy as np
+
+SPREAD_TYPES = ("Bull Put", "Bear Call")
+DECISIONS = ("ENTER", "WATCH", "SKIP")
+
+SPREAD_DTYPE = np.dtype([
+    ("ticker", np.uint16),        # index into SpreadTable.tickers
+    ("type", np.uint8),           # index into SPREAD_TYPES
+    ("expiration", np.uint16),    # index into SpreadTable.dates
+    ("dte", np.int16),
+    ("stock_price", np.float64),
+    ("short_strike", np.float64),
+    ("long_strike", np.float64),
+    ("width", np.float64),
+    ("net_credit", np.float64),
+    ("max_loss", np.float64),
+    ("roi", np.float64),
+    ("pop", np.float64),
+    ("short_iv", np.float64),
+    ("short_delta", np.float64),
+    ("mc_pop", np.float64),       # set by monte_carlo, NaN = not simulated
+    ("touch_prob", np.float64),
+    ("expected_pnl", np.float64),
+    ("score", np.float64),        # set by ranking
+    ("decision", np.uint8),       # index into DECISIONS, set by ranking
+    ("rank", np.int32),           # 1-based, 0 = not ranked
+])
+
+# Spread fields copied as-is into output dicts, in output order
+VALUE_FIELDS = (
+    "stock_price", "short_strike", "long_strike", "width", "net_credit",
+    "max_loss", "roi", "pop", "short_iv", "short_delta"
+)
+
+# Monte Carlo fields, only output for simulated spreads
+SIM_FIELDS = ("mc_pop", "touch_prob", "expected_pnl")
+
+CONDOR_DTYPE = np.dtype([
+    ("ticker", np.uint16),
+    ("expiration", np.uint16),
+    ("dte", np.int16),
+    ("stock_price", np.float64),
+    ("put_long", np.float64),
+    ("put_short", np.float64),
+    ("call_short", np.float64),
+    ("call_long", np.float64),
+    ("width", np.float64),
+    ("net_credit", np.float64),
+    ("max_loss", np.float64),
+    ("roi", np.float64),
+    ("pop", np.float64),
+    ("score", np.float64),
+    ("decision", np.uint8),
+    ("rank", np.int32),
+])
+
+CONDOR_FIELDS = (
+    "stock_price", "put_long", "put_short", "call_short", "call_long",
+    "width", "net_credit", "max_loss", "roi", "pop"
+)
+
+
+def py_round(values, ndigits):
+    """
+    Round an array exactly like Python's round()
+
+    np.round scales, rounds and unscales, which can pick the other
+    neighbour when the scaled value lands next to .5; those elements are
+    redone with round() so columnar and scalar code agree.
+
+    Args:
+        values: Array of floats
+        ndigits: Decimal places
+
+    Returns:
+        ndarray: Rounded values
+    """
+    values = np.asarray(values, dtype=float)
+    rounded = np.round(values, ndigits)
+
+    scaled = values * 10.0 ** ndigits
+    with np.errstate(invalid="ignore"):
+        near_half = np.abs(np.abs(scaled - np.trunc(scaled)) - 0.5) < 1e-6
+    for i in np.flatnonzero(near_half):
+        rounded[i] = round(float(values[i]), ndigits)
+    return rounded
+
+
+class SpreadTable:
+    """
+    Spread records plus the ticker and expiration-date tables they index
+
+    Args:
+        records: Structured array of SPREAD_DTYPE
+        tickers: Ticker symbols referenced by records["ticker"]
+        dates: Expiration dates referenced by records["expiration"]
+    """
+
+    DTYPE = SPREAD_DTYPE
+
+    def __init__(self, records=None, tickers=(), dates=()):
+        self.records = np.zeros(0, self.DTYPE) if records is None else records
+        self.tickers = list(tickers)
+        self.dates = list(dates)
+
+    def __len__(self):
+        return len(self.records)
+
+    @classmethod
+    def concat(cls, tables):
+        """Merge tables in order, re-interning tickers and dates"""
+        tickers, dates = {}, {}
+        parts = []
+
+        for table in tables:
+            ticker_codes = np.array([tickers.setdefault(t, len(tickers)) for t in table.tickers], dtype=np.uint16)
+            date_codes = np.array([dates.setdefault(d, len(dates)) for d in table.dates], dtype=np.uint16)
+
+            records = table.records.copy()
+            if len(records):
+                records["ticker"] = ticker_codes[records["ticker"]]
+                records["expiration"] = date_codes[records["expiration"]]
+            parts.append(records)
+
+        records = np.concatenate(parts) if parts else None
+        return cls(records, tickers, dates)
+
+    def take(self, rows):
+        """New table holding the given rows, in the given order"""
+        return type(self)(self.records[rows], self.tickers, self.dates)
+
+    def count(self, spread_type):
+        """Number of spreads of a type ("Bull Put" or "Bear Call")"""
+        return int(np.count_nonzero(self.records["type"] == SPREAD_TYPES.index(spread_type)))
+
+    def to_dicts(self, ranked=False):
+        """
+        Expand records into spread dicts (the step 05/06 JSON format)
+
+        Args:
+            ranked: Include score, decision and rank
+
+        Returns:
+            list: One dict per record
+        """
+        records = self.records
+        values = [records[name].tolist() for name in VALUE_FIELDS]
+        tickers = [self.tickers[code] for code in records["ticker"].tolist()]
+        types = [SPREAD_TYPES[code] for code in records["type"].tolist()]
+        dates = [self.dates[code] for code in records["expiration"].tolist()]
+        dtes = records["dte"].tolist()
+
+        spreads = []
+        for k, row in enumerate(zip(*values)):
+            spread = {"ticker": tickers[k], "type": types[k]}
+            spread.update(zip(VALUE_FIELDS, row))
+            spread["expiration"] = {"date": dates[k], "dte": dtes[k]}
+            spreads.append(spread)
+
+        simulated = np.flatnonzero(~np.isnan(records["mc_pop"]))
+        if len(simulated):
+            values = [records[name][simulated].tolist() for name in SIM_FIELDS]
+            for k, row in zip(simulated.tolist(), zip(*values)):
+                spreads[k].update(zip(SIM_FIELDS, row))
+
+        if ranked:
+            scores = records["score"].tolist()
+            decisions = records["decision"].tolist()
+            ranks = records["rank"].tolist()
+            for k, spread in enumerate(spreads):
+                spread["score"] = scores[k]
+                spread["decision"] = DECISIONS[decisions[k]]
+                spread["rank"] = ranks[k]
+
+        return spreads
+
+    def arrays(self):
+        """Arrays for np.savez"""
+        return {
+            "records": self.records,
+            "tickers": np.array(self.tickers, dtype=str),
+            "dates": np.array(self.dates, dtype=str),
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        """Rebuild a table from np.load output"""
+        return cls(arrays["records"], arrays["tickers"].tolist(), arrays["dates"].tolist())
+
+    def save(self, path, **extra):
+        """Write table (plus extra arrays) to an .npz file atomically"""
+        buffer = io.BytesIO()
+        np.savez(buffer, **self.arrays(), **extra)
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(buffer.getvalue())
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """Read a table written by save()"""
+        with np.load(path) as arrays:
+            return cls.from_arrays(arrays)
+
+
+class CondorTable(SpreadTable):
+    """Iron condor records (CONDOR_DTYPE) with interned tickers and dates"""
+
+    DTYPE = CONDOR_DTYPE
+
+    def to_dicts(self, ranked=False):
+        """
+        Expand records into iron condor dicts
+
+        Args:
+            ranked: Include score, decision and rank
+
+        Returns:
+            list: One dict per record
+        """
+        records = self.records
+        values = [records[name].tolist() for name in CONDOR_FIELDS]
+        tickers = [self.tickers[code] for code in records["ticker"].tolist()]
+        dates = [self.dates[code] for code in records["expiration"].tolist()]
+        dtes = records["dte"].tolist()
+
+        condors = []
+        for k, row in enumerate(zip(*values)):
+            condor = {"ticker": tickers[k], "type": "Iron Condor"}
+            condor.update(zip(CONDOR_FIELDS, row))
+            condor["expiration"] = {"date": dates[k], "dte": dtes[k]}
+            if ranked:
+                condor["score"] = float(records["score"][k])
+                condor["decision"] = DECISIONS[records["decision"][k]]
+                condor["rank"] = int(records["rank"][k])
+            condors.append(condor)
+        return condors
+
@@ -0,0 +1,254 @@
+"""
+Synthetic Option Chains
+Deterministic chain snapshots for benchmarking steps 03-07 without
+Schwab data
+
+Writes data/stock_prices.json, data/chains.json,
+data/chains_with_greeks.json and the data/chains.parquet store in the
+layout produced by steps 01/02. Strikes cover the same 70-130% of spot
+window step 02 keeps. Quotes are Black-Scholes prices on a skewed
+volatility surface: IV rises for low strikes (put skew), curves up in
+both wings (capped) and is higher for near expirations. Bid/ask widths,
+missing quotes and missing Greeks are drawn from a seeded generator, so
+equal arguments give byte-identical files.
+
+Usage:
+    python synthetic_chains.py --tickers 40 --expirations 7 --strikes 80
+"""
+import argparse
+import json
+import math
+import os
+from datetime import date, timedelta
+
+import numpy as np
+from scipy.special import ndtr
+
+from chain_store import chains_to_frame, write_store
+from option_chains import MAX_STRIKE_PCT, MIN_STRIKE_PCT
+from spread_engine import RISK_FREE_RATE
+
+# Snapshot date (fixed so output does not depend on the day it is run)
+AS_OF = date(2026, 1, 5)
+
+# First expiration's DTE and spacing between expirations (weeklies)
+FIRST_DTE = 3
+DTE_STEP = 7
+
+# Share of contracts without a quote / without Greeks
+MISSING_QUOTE = 0.02
+MISSING_GREEKS = 0.02
+
+# Smile is flat beyond this many standard deviations of moneyness
+MAX_WING = 3.0
+# IV bounds (fractional)
+MIN_IV = 0.05
+MAX_IV = 1.5
+
+
+def occ_symbol(ticker, expiration, put_call, strike):
+    """Schwab/OCC style contract symbol, e.g. 'AAPL  260116C00150000'"""
+    return f"{ticker:<6}{expiration:%y%m%d}{put_call}{round(strike * 1000):08d}"
+
+
+def option_surface(price, strikes, dte, atm_iv, skew, smile):
+    """
+    Black-Scholes quotes and Greeks for one expiration
+
+    Args:
+        price: Underlying price
+        strikes: Array of strikes
+        dte: Days to expiration
+        atm_iv: At-the-money IV for this expiration (fractional)
+        skew: IV slope per standard deviation of moneyness (negative = put skew)
+        smile: IV curvature per squared standard deviation (both applied
+            up to MAX_WING standard deviations)
+
+    Returns:
+        dict: iv plus call_/put_ price, delta, theta and rho arrays, gamma and vega
+    """
+    T = dte / 365.0
+    r = RISK_FREE_RATE
+    sqrt_t = math.sqrt(T)
+
+    moneyness = np.clip(np.log(strikes / price) / (atm_iv * sqrt_t), -MAX_WING, MAX_WING)
+    iv = np.clip(atm_iv * (1 + skew * moneyness + smile * moneyness ** 2), MIN_IV, MAX_IV)
+
+    d1 = (np.log(price / strikes) + (r + 0.5 * iv ** 2) * T) / (iv * sqrt_t)
+    d2 = d1 - iv * sqrt_t
+    discount = math.exp(-r * T)
+    density = np.exp(-0.5 * d1 ** 2) / math.sqrt(2 * math.pi)
+
+    call = price * ndtr(d1) - strikes * discount * ndtr(d2)
+    put = strikes * discount * ndtr(-d2) - price * ndtr(-d1)
+    decay = -price * density * iv / (2 * sqrt_t)
+
+    return {
+        "iv": iv,
+        "call_price": call,
+        "put_price": put,
+        "call_delta": ndtr(d1),
+        "put_delta": ndtr(d1) - 1,
+        "gamma": density / (price * iv * sqrt_t),
+        "vega": price * density * sqrt_t / 100,
+        "call_theta": (decay - r * strikes * discount * ndtr(d2)) / 365,
+        "put_theta": (decay + r * strikes * discount * ndtr(-d2)) / 365,
+        "call_rho": strikes * T * discount * ndtr(d2) / 100,
+        "put_rho": -strikes * T * discount * ndtr(-d2) / 100,
+    }
+
+
+def ticker_chain(rng, ticker, price, expirations, strikes):
+    """
+    Synthetic expirations for one ticker (step 02 --with-greeks layout)
+
+    Args:
+        rng: numpy Generator
+        ticker: Symbol
+        price: Underlying price
+        expirations: Number of weekly expirations
+        strikes: Strikes per expiration, evenly spaced over 70-130% of price
+
+    Returns:
+        list: Expiration dicts with strike records including Greeks
+    """
+    # Whole cents inside the window, so step 02's filter would keep every strike
+    low, high = math.ceil(MIN_STRIKE_PCT * price * 100), math.floor(MAX_STRIKE_PCT * price * 100)
+    listed = np.unique(np.round(np.linspace(low, high, strikes))) / 100
+
+    base_iv = rng.uniform(0.18, 0.65)
+    skew = -rng.uniform(0.05, 0.2)
+    smile = rng.uniform(0.01, 0.04)
+
+    chain = []
+    for n in range(expirations):
+        dte = FIRST_DTE + n * DTE_STEP
+        expiration = AS_OF + timedelta(days=dte)
+        atm_iv = base_iv * (1 + 0.15 * math.exp(-dte / 20))
+        surface = option_surface(price, listed, dte, atm_iv, skew, smile)
+
+        rows = []
+        for i, strike in enumerate(listed.tolist()):
+            record = {"strike": float(strike)}
+            for side, put_call in (("call", "C"), ("put", "P")):
+                if rng.random() < MISSING_QUOTE:
+                    continue
+
+                value = float(surface[f"{side}_price"][i])
+                half_width = max(0.01, value * rng.uniform(0.01, 0.06))
+                record[f"{side}_symbol"] = occ_symbol(ticker, expiration, put_call, strike)
+                record[f"{side}_bid"] = round(max(value - half_width, 0.0), 2)
+                record[f"{side}_ask"] = round(value + half_width, 2)
+
+                if rng.random() >= MISSING_GREEKS:
+                    record[f"{side}_greeks"] = {
+                        "delta": round(float(surface[f"{side}_delta"][i]), 4),
+                        "gamma": round(float(surface["gamma"][i]), 4),
+                        "theta": round(float(surface[f"{side}_theta"][i]), 4),
+                        "vega": round(float(surface["vega"][i]), 4),
+                        "rho": round(float(surface[f"{side}_rho"][i]), 4),
+                        "iv": round(float(surface["iv"][i]), 4)
+                    }
+            rows.append(record)
+
+        chain.append({"expiration_date": expiration.isoformat(), "dte": dte, "strikes": rows})
+    return chain
+
+
+def generate_snapshot(tickers=40, expirations=7, strikes=80, seed=0):
+    """
+    Build a synthetic price and chain snapshot
+
+    Args:
+        tickers: Number of underlyings (SYN000, SYN001, ...)
+        expirations: Weekly expirations per ticker
+        strikes: Strikes per expiration
+        seed: Generator seed
+
+    Returns:
+        tuple: (prices, chains_with_greeks) dicts keyed by ticker
+    """
+    rng = np.random.default_rng(seed)
+    prices, chains = {}, {}
+    timestamp = f"{AS_OF.isoformat()}T16:00:00"
+
+    for n in range(tickers):
+        ticker = f"SYN{n:03d}"
+        mid = round(float(math.exp(rng.uniform(math.log(15), math.log(600)))), 2)
+        spread = max(0.01, round(mid * 0.0004, 2))
+        prices[ticker] = {
+            "ticker": ticker,
+            "bid": round(mid - spread / 2, 2),
+            "ask": round(mid + spread / 2, 2),
+            "mid": mid,
+            "spread": spread,
+            "timestamp": timestamp
+        }
+        chains[ticker] = ticker_chain(rng, ticker, mid, expirations, strikes)
+
+    return prices, chains
+
+
+def write_snapshot(data_dir="data", **kwargs):
+    """
+    Write stock_prices.json, chains.json, chains_with_greeks.json and chains.parquet
+
+    Args:
+        data_dir: Output directory
+        **kwargs: generate_snapshot() arguments
+
+    Returns:
+        tuple: (prices, chains_with_greeks) as written
+    """
+    prices, chains = generate_snapshot(**kwargs)
+    timestamp = f"{AS_OF.isoformat()}T16:00:00"
+    plain = {
+        ticker: [
+            {**exp, "strikes": [
+                {k: v for k, v in s.items() if k not in ("call_greeks", "put_greeks")}
+                for s in exp["strikes"]
+            ]}
+            for exp in exps
+        ]
+        for ticker, exps in chains.items()
+    }
+
+    documents = {
+        "stock_prices.json": {
+            "timestamp": timestamp, "requested": len(prices), "success": len(prices),
+            "failed": 0, "prices": prices, "missing_tickers": []
+        },
+        "chains.json": {"timestamp": timestamp, "total_tickers": len(plain), "chains": plain},
+        "chains_with_greeks.json": {
+            "timestamp": timestamp, "total_tickers": len(chains), "chains_with_greeks": chains
+        },
+    }
+
+    os.makedirs(data_dir, exist_ok=True)
+    for name, document in documents.items():
+        with open(os.path.join(data_dir, name), "w") as f:
+            json.dump(document, f, indent=2)
+
+    # Written after the JSON so readers prefer the (newer) store
+    write_store(chains_to_frame(chains), os.path.join(data_dir, "chains.parquet"), tickers=list(chains))
+
+    return prices, chains
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic option chain snapshot")
+    parser.add_argument("--tickers", type=int, default=40, help="Number of underlyings")
+    parser.add_argument("--expirations", type=int, default=7, help="Weekly expirations per ticker")
+    parser.add_argument("--strikes", type=int, default=80, help="Strikes per expiration")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    parser.add_argument("--data-dir", default="data", help="Output directory (default: data)")
+    args = parser.parse_args()
+
+    write_snapshot(args.data_dir, tickers=args.tickers, expirations=args.expirations,
+                   strikes=args.strikes, seed=args.seed)
+    print(f"✅ Synthetic snapshot: {args.tickers} tickers x {args.expirations} expirations x "
+          f"{args.strikes} strikes in {args.data_dir}/")
+
+
+if __name__ == "__main__":
+    main()
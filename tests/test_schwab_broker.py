@@ -0,0 +1,48 @@
+"""
+Schwab broker: a failing client factory must reach the calling step
+"""
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+from schwab_broker import ADDRESS_ENV, AUTHKEY_ENV, start_broker
+
+CHILD = """
+import sys
+sys.path.append(sys.argv[1])
+from schwab_broker import connect_broker
+
+client = connect_broker()
+for _ in range(2):
+    try:
+        client.get_quote("AAPL")
+    except Exception as e:
+        print(type(e).__name__, e)
+"""
+
+
+def test_failing_factory_reaches_child(monkeypatch):
+    # start_broker() exports its address; setting the variables through
+    # monkeypatch first makes pytest restore them afterwards
+    monkeypatch.setenv(ADDRESS_ENV, "")
+    monkeypatch.setenv(AUTHKEY_ENV, "")
+    calls = []
+
+    def factory():
+        # Same failure mode as schwab_client.create_schwab_client()
+        calls.append(1)
+        sys.exit(1)
+
+    start_broker(factory)
+    result = subprocess.run(
+        [sys.executable, "-c", CHILD, ROOT], capture_output=True, text=True, timeout=30
+    )
+
+    assert result.returncode == 0, result.stderr
+    lines = result.stdout.splitlines()
+    assert len(lines) == 2
+    assert all(line.startswith("RuntimeError Schwab client authentication failed") for line in lines)
+    # The failure is kept: later requests don't retry authentication
+    assert len(calls) == 1
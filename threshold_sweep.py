@@ -0,0 +1,168 @@
+"""
+Threshold Sweep
+Evaluates a grid of step 05 filter / step 06 decision settings against
+one chain snapshot in a single pass
+
+Pairs are built once with the loosest filters of the grid, keeping their
+raw delta, credit, ROI and PoP. Each setting is then just a mask over
+those columns followed by the usual best-per-ticker ranking, so it selects
+exactly the spreads a full pipeline run with that setting would.
+"""
+import itertools
+
+import numpy as np
+
+from spread_engine import (
+    DEFAULT_FILTERS, MAX_WIDTH, SIDES, SpreadFilters, emit_records, pack_ticker,
+    side_arrays, ticker_verticals
+)
+from spread_ranking import DECISION_RULES, rank_spreads, spread_scores
+from spread_records import DECISIONS, SpreadTable
+
+# Every parameter a sweep setting may override
+SWEEP_PARAMS = SpreadFilters._fields + tuple(DECISION_RULES)
+
+
+def expand_grid(values):
+    """
+    Cartesian product of parameter values
+
+    Args:
+        values: Parameter name to list of values
+
+    Returns:
+        list: One settings dict per combination
+    """
+    names = list(values)
+    return [dict(zip(names, combo)) for combo in itertools.product(*(values[n] for n in names))]
+
+
+def split_setting(setting):
+    """Split a settings dict into (SpreadFilters, decision rules), filling defaults"""
+    unknown = set(setting) - set(SWEEP_PARAMS)
+    if unknown:
+        raise ValueError(f"Unknown sweep parameters: {', '.join(sorted(unknown))}")
+
+    filters = DEFAULT_FILTERS._replace(**{k: v for k, v in setting.items() if k in SpreadFilters._fields})
+    rules = {k: setting.get(k, v) for k, v in DECISION_RULES.items()}
+    return filters, rules
+
+
+def loosest(filters_list):
+    """Filters admitting every pair any of filters_list admits"""
+    return SpreadFilters(
+        min_short_delta=min(f.min_short_delta for f in filters_list),
+        max_short_delta=max(f.max_short_delta for f in filters_list),
+        min_net_credit=min(f.min_net_credit for f in filters_list),
+        min_roi=min(f.min_roi for f in filters_list),
+        max_roi=max(f.max_roi for f in filters_list),
+        min_pop=min(f.min_pop for f in filters_list),
+    )
+
+
+def sweep_candidates(chains, prices, filters, max_width=MAX_WIDTH, packed=None):
+    """
+    Build every pair admitted by filters, with raw filter columns
+
+    Args:
+        chains: Ticker to expiration list from chains_with_greeks.json
+        prices: Ticker to price record from stock_prices.json
+        filters: Loosest SpreadFilters of the sweep
+        max_width: Skip spreads wider than this (None = no limit)
+        packed: Ticker to (matrix, layout) already packed (see all_spreads)
+
+    Returns:
+        tuple: (SpreadTable, columns) - columns holds unrounded delta,
+            net_credit, roi and pop arrays aligned with the table rows
+    """
+    tables = []
+    raw = {"delta": [], "net_credit": [], "roi": [], "pop": []}
+
+    for ticker, expirations in chains.items():
+        if ticker not in prices:
+            continue
+
+        stock_price = prices[ticker]["mid"]
+        matrix, layout = packed[ticker] if packed is not None else pack_ticker(expirations)
+        results = ticker_verticals(matrix, layout, stock_price, max_width, filters)
+        tables.append(emit_records(ticker, expirations, stock_price, matrix, layout, results))
+
+        # Same (expiration, side) order as emit_records
+        verticals = iter(results)
+        for _, _, start, stop in layout:
+            block = matrix[start:stop]
+            for side_no in range(len(SIDES)):
+                v = next(verticals)
+                raw["delta"].append(side_arrays(block, side_no)["delta"][v["short_idx"]])
+                for key in ("net_credit", "roi", "pop"):
+                    raw[key].append(v[key])
+
+    table = SpreadTable.concat(tables)
+    columns = {k: np.concatenate(v) if v else np.empty(0) for k, v in raw.items()}
+    return table, columns
+
+
+def setting_mask(columns, filters):
+    """Rows of the candidate superset that pass filters (same tests as build_verticals)"""
+    delta = columns["delta"]
+    return (
+        ~((delta < filters.min_short_delta) | (delta > filters.max_short_delta))
+        & ~(columns["net_credit"] <= filters.min_net_credit)
+        & (columns["roi"] >= filters.min_roi)
+        & (columns["roi"] <= filters.max_roi)
+        & (columns["pop"] >= filters.min_pop)
+    )
+
+
+def run_sweep(chains, prices, settings, top=3, max_width=MAX_WIDTH, packed=None):
+    """
+    Evaluate every setting against one chain snapshot
+
+    Args:
+        chains: Ticker to expiration list from chains_with_greeks.json
+        prices: Ticker to price record from stock_prices.json
+        settings: List of settings dicts (keys from SWEEP_PARAMS)
+        top: Top picks reported per setting
+        max_width: Skip spreads wider than this (None = no limit)
+        packed: Ticker to (matrix, layout) already packed (see all_spreads)
+
+    Returns:
+        list: Per setting - thresholds used, candidate counts, decision
+            counts of the best-per-ticker ranking and its top picks
+    """
+    parsed = [split_setting(s) for s in settings]
+    table, columns = sweep_candidates(chains, prices, loosest([f for f, _ in parsed]), max_width, packed)
+    scores = spread_scores(table.records)
+
+    report = []
+    for filters, rules in parsed:
+        rows = np.flatnonzero(setting_mask(columns, filters))
+        candidates = table.take(rows)
+        ranked = rank_spreads(candidates, rules=rules, scores=scores[rows])
+        decisions = np.bincount(ranked.records["decision"], minlength=len(DECISIONS))
+
+        picks = [
+            {
+                "ticker": s["ticker"],
+                "type": s["type"],
+                "legs": f"{s['short_strike']:g}/{s['long_strike']:g}",
+                "expiration": s["expiration"]["date"],
+                "roi": s["roi"],
+                "pop": s["pop"],
+                "score": s["score"],
+                "decision": s["decision"]
+            }
+            for s in ranked.take(slice(0, top)).to_dicts(ranked=True)
+        ]
+
+        report.append({
+            "thresholds": {**filters._asdict(), **rules},
+            "candidates": len(candidates),
+            "bull_puts": candidates.count("Bull Put"),
+            "bear_calls": candidates.count("Bear Call"),
+            "tickers": len(ranked),
+            **{d.lower(): int(n) for d, n in zip(DECISIONS, decisions)},
+            "top": picks
+        })
+
+    return report
@@ -0,0 +1,360 @@
+"""
+Run Warehouse
+SQLite history of every pipeline run's artifacts
+
+Each run's quotes, screening results, option chains, spreads, rankings,
+report and GPT analysis are copied into data/warehouse.db under a run id,
+so history survives the JSON files being overwritten. Every table carries
+the run timestamp and is indexed on (ticker, run_ts); chains, spreads and
+rankings are also indexed on (ticker, expiration, strike), so questions
+like "how did AAPL's best spread evolve this week" are one indexed query.
+
+Rows are inserted with executemany inside one transaction per run.
+
+Usage:
+    python warehouse.py runs
+    python warehouse.py best AAPL --days 7
+    python warehouse.py quotes AAPL --days 7
+    python warehouse.py contract AAPL 2026-01-16 150 --side P
+"""
+import argparse
+import json
+import os
+import sqlite3
+from datetime import datetime, timedelta
+from dotenv import load_dotenv
+
+from spread_records import DECISIONS, SPREAD_TYPES, SpreadTable
+
+load_dotenv()
+
+WAREHOUSE_PATH = os.getenv("WAREHOUSE_PATH", "data/warehouse.db")
+
+# Screening steps: (artifact, stage name)
+SCREENS = (
+    ("filter1_passed.json", "price"),
+    ("filter2_passed.json", "options"),
+    ("filter3_passed.json", "iv"),
+)
+
+SPREAD_COLUMNS = (
+    "ticker", "type", "expiration", "dte", "stock_price", "short_strike", "long_strike", "width",
+    "net_credit", "max_loss", "roi", "pop", "short_iv", "short_delta", "mc_pop", "touch_prob",
+    "expected_pnl"
+)
+RANK_COLUMNS = SPREAD_COLUMNS + ("score", "decision", "rank")
+
+CHAIN_COLUMNS = (
+    "ticker", "expiration", "dte", "strike", "put_call", "symbol", "bid", "ask",
+    "delta", "gamma", "theta", "vega", "rho", "iv"
+)
+
+_SPREAD_SQL = """
+    ticker TEXT NOT NULL, type TEXT, expiration TEXT, dte INTEGER, stock_price REAL,
+    short_strike REAL, long_strike REAL, width REAL, net_credit REAL, max_loss REAL,
+    roi REAL, pop REAL, short_iv REAL, short_delta REAL, mc_pop REAL, touch_prob REAL,
+    expected_pnl REAL"""
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_ts TEXT NOT NULL,
+    archived_ts TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS artifacts (
+    run_id INTEGER NOT NULL REFERENCES runs(run_id),
+    name TEXT NOT NULL,
+    file_ts TEXT,
+    rows INTEGER
+);
+CREATE TABLE IF NOT EXISTS screens (
+    run_id INTEGER NOT NULL, run_ts TEXT NOT NULL, stage TEXT NOT NULL,
+    ticker TEXT NOT NULL, mid REAL, spread_pct REAL, atm_iv REAL, data TEXT
+);
+CREATE TABLE IF NOT EXISTS quotes (
+    run_id INTEGER NOT NULL, run_ts TEXT NOT NULL,
+    ticker TEXT NOT NULL, bid REAL, ask REAL, mid REAL, spread REAL, quote_ts TEXT
+);
+CREATE TABLE IF NOT EXISTS chains (
+    run_id INTEGER NOT NULL, run_ts TEXT NOT NULL,
+    ticker TEXT NOT NULL, expiration TEXT NOT NULL, dte INTEGER, strike REAL NOT NULL,
+    put_call TEXT, symbol TEXT, bid REAL, ask REAL,
+    delta REAL, gamma REAL, theta REAL, vega REAL, rho REAL, iv REAL
+);
+CREATE TABLE IF NOT EXISTS spreads (
+    run_id INTEGER NOT NULL, run_ts TEXT NOT NULL,{_SPREAD_SQL}
+);
+CREATE TABLE IF NOT EXISTS rankings (
+    run_id INTEGER NOT NULL, run_ts TEXT NOT NULL,{_SPREAD_SQL},
+    score REAL, decision TEXT, rank INTEGER
+);
+CREATE TABLE IF NOT EXISTS reports (
+    run_id INTEGER NOT NULL, run_ts TEXT NOT NULL,
+    rank INTEGER, ticker TEXT NOT NULL, entry TEXT
+);
+CREATE TABLE IF NOT EXISTS analyses (
+    run_id INTEGER NOT NULL, run_ts TEXT NOT NULL, tickers TEXT, analysis TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_screens_ticker_ts ON screens (ticker, run_ts);
+CREATE INDEX IF NOT EXISTS idx_quotes_ticker_ts ON quotes (ticker, run_ts);
+CREATE INDEX IF NOT EXISTS idx_chains_ticker_ts ON chains (ticker, run_ts);
+CREATE INDEX IF NOT EXISTS idx_chains_contract ON chains (ticker, expiration, strike);
+CREATE INDEX IF NOT EXISTS idx_spreads_ticker_ts ON spreads (ticker, run_ts);
+CREATE INDEX IF NOT EXISTS idx_spreads_contract ON spreads (ticker, expiration, short_strike);
+CREATE INDEX IF NOT EXISTS idx_rankings_ticker_ts ON rankings (ticker, run_ts);
+CREATE INDEX IF NOT EXISTS idx_rankings_contract ON rankings (ticker, expiration, short_strike);
+CREATE INDEX IF NOT EXISTS idx_reports_ticker_ts ON reports (ticker, run_ts);
+CREATE INDEX IF NOT EXISTS idx_artifacts_run ON artifacts (run_id);
+"""
+
+
+def spread_rows(table, columns):
+    """
+    Row tuples for a SpreadTable, codes expanded to their names
+
+    Args:
+        table: SpreadTable
+        columns: SPREAD_COLUMNS or RANK_COLUMNS
+
+    Returns:
+        iterator: One tuple per spread, in columns order
+    """
+    names = {"ticker": table.tickers, "type": SPREAD_TYPES, "expiration": table.dates, "decision": DECISIONS}
+    values = []
+    for column in columns:
+        codes = table.records[column].tolist()
+        values.append([names[column][c] for c in codes] if column in names else codes)
+    return zip(*values)
+
+
+class Warehouse:
+    """
+    SQLite store of pipeline runs
+
+    Args:
+        path: Database file (created with its schema if missing)
+    """
+
+    def __init__(self, path=WAREHOUSE_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def _insert(self, table, columns, run, rows):
+        """executemany rows (tuples in columns order) under a run; returns the row count"""
+        sql = (f"INSERT INTO {table} (run_id, run_ts, {', '.join(columns)}) "
+               f"VALUES ({', '.join('?' * (len(columns) + 2))})")
+        before = self.conn.total_changes
+        self.conn.executemany(sql, ((*run, *row) for row in rows))
+        return self.conn.total_changes - before
+
+    def archive_run(self, data_dir="data", run_ts=None, since=None):
+        """
+        Copy the artifacts in data_dir into the warehouse as one run
+
+        Args:
+            data_dir: Pipeline data directory
+            run_ts: Run timestamp (ISO, default: now)
+            since: Skip artifacts last written before this datetime (left
+                over from an earlier run)
+
+        Returns:
+            tuple: (run_id, {artifact: rows archived})
+        """
+        run_ts = run_ts or datetime.now().isoformat(timespec="seconds")
+        archived = {}
+
+        def artifact(name):
+            path = os.path.join(data_dir, name)
+            if not os.path.exists(path):
+                return None
+            modified = datetime.fromtimestamp(os.path.getmtime(path))
+            if since is not None and modified < since:
+                return None
+            return path, modified.isoformat(timespec="seconds")
+
+        def load_json(path):
+            with open(path, "r") as f:
+                return json.load(f)
+
+        with self.conn:
+            run_id = self.conn.execute(
+                "INSERT INTO runs (run_ts, archived_ts) VALUES (?, ?)",
+                (run_ts, datetime.now().isoformat(timespec="seconds"))
+            ).lastrowid
+            run = (run_id, run_ts)
+            files = {}
+
+            for name, stage in SCREENS:
+                found = artifact(name)
+                if found:
+                    files[name] = found
+                    archived[name] = self._insert(
+                        "screens", ("stage", "ticker", "mid", "spread_pct", "atm_iv", "data"), run,
+                        ((stage, s["ticker"], s.get("mid"), s.get("spread_pct"), s.get("atm_iv"), json.dumps(s))
+                         for s in load_json(found[0]))
+                    )
+
+            found = artifact("stock_prices.json")
+            if found:
+                files["stock_prices.json"] = found
+                prices = load_json(found[0])["prices"]
+                archived["stock_prices.json"] = self._insert(
+                    "quotes", ("ticker", "bid", "ask", "mid", "spread", "quote_ts"), run,
+                    ((t, p.get("bid"), p.get("ask"), p.get("mid"), p.get("spread"), p.get("timestamp"))
+                     for t, p in prices.items())
+                )
+
+            found = artifact("chains.parquet") or artifact("chains_with_greeks.json") or artifact("chains.json")
+            if found:
+                name = os.path.basename(found[0])
+                files[name] = found
+                archived[name] = self._insert_chains(run, found[0])
+
+            for name, table, columns in (("spreads.npz", "spreads", SPREAD_COLUMNS),
+                                         ("ranked_spreads.npz", "rankings", RANK_COLUMNS)):
+                found = artifact(name)
+                if found:
+                    files[name] = found
+                    archived[name] = self._insert(table, columns, run,
+                                                  spread_rows(SpreadTable.load(found[0]), columns))
+
+            found = artifact("report_table.json")
+            if found:
+                files["report_table.json"] = found
+                archived["report_table.json"] = self._insert(
+                    "reports", ("rank", "ticker", "entry"), run,
+                    ((e.get("rank"), e["ticker"], json.dumps(e)) for e in load_json(found[0])["report_table"])
+                )
+
+            found = artifact("top9_analysis.json")
+            if found:
+                files["top9_analysis.json"] = found
+                analysis = load_json(found[0])
+                archived["top9_analysis.json"] = self._insert(
+                    "analyses", ("tickers", "analysis"), run,
+                    [(json.dumps(analysis.get("tickers", [])), analysis.get("analysis"))]
+                )
+
+            self.conn.executemany(
+                "INSERT INTO artifacts (run_id, name, file_ts, rows) VALUES (?, ?, ?, ?)",
+                [(run_id, name, files[name][1], rows) for name, rows in archived.items()]
+            )
+
+        return run_id, archived
+
+    def _insert_chains(self, run, path):
+        """Contracts from the chain store (or legacy chain JSON next to it)"""
+        from chain_store import NO_CONTRACT, read_store
+
+        store = path if path.endswith(".parquet") else os.path.join(os.path.dirname(path), "chains.parquet")
+        frame = read_store(store)
+        frame = frame[frame["put_call"] != NO_CONTRACT]
+
+        source = {"expiration": "expiration_date"}
+        values = [frame[source.get(c, c)].tolist() for c in CHAIN_COLUMNS]
+        return self._insert("chains", CHAIN_COLUMNS, run, zip(*values))
+
+    def runs(self, limit=20):
+        """Latest runs with their archived row counts"""
+        return [dict(r) for r in self.conn.execute(
+            """SELECT r.run_id, r.run_ts, COUNT(a.name) AS artifacts, SUM(a.rows) AS rows
+               FROM runs r LEFT JOIN artifacts a ON a.run_id = r.run_id
+               GROUP BY r.run_id ORDER BY r.run_ts DESC LIMIT ?""", (limit,)
+        )]
+
+    def best_spreads(self, ticker, since=None):
+        """
+        Best-ranked spread of a ticker in every run
+
+        Args:
+            ticker: Underlying symbol
+            since: Only runs at or after this ISO timestamp
+
+        Returns:
+            list: One dict per run, oldest first
+        """
+        # Bare columns with MIN() come from the row holding the minimum
+        return [dict(r) for r in self.conn.execute(
+            """SELECT run_id, run_ts, MIN(rank) AS rank, type, expiration, dte, stock_price,
+                      short_strike, long_strike, net_credit, roi, pop, score, decision
+               FROM rankings WHERE ticker = ? AND run_ts >= ?
+               GROUP BY run_id ORDER BY run_ts""", (ticker, since or "")
+        )]
+
+    def quote_history(self, ticker, since=None):
+        """Underlying quotes of a ticker per run, oldest first"""
+        return [dict(r) for r in self.conn.execute(
+            """SELECT run_id, run_ts, bid, ask, mid, spread, quote_ts FROM quotes
+               WHERE ticker = ? AND run_ts >= ? ORDER BY run_ts""", (ticker, since or "")
+        )]
+
+    def contract_history(self, ticker, expiration, strike, put_call=None):
+        """Quotes and Greeks of one strike (both sides unless put_call is 'C' or 'P') per run"""
+        sql = """SELECT run_id, run_ts, put_call, symbol, bid, ask, delta, iv, dte FROM chains
+                 WHERE ticker = ? AND expiration = ? AND strike = ?"""
+        params = [ticker, expiration, strike]
+        if put_call:
+            sql += " AND put_call = ?"
+            params.append(put_call)
+        return [dict(r) for r in self.conn.execute(sql + " ORDER BY run_ts, put_call", params)]
+
+
+def print_rows(rows):
+    """Print query results as an aligned table"""
+    if not rows:
+        print("(no rows)")
+        return
+    columns = list(rows[0])
+    text = [[("" if r[c] is None else str(r[c])) for c in columns] for r in rows]
+    widths = [max(len(c), *(len(t[k]) for t in text)) for k, c in enumerate(columns)]
+    print("  ".join(c.ljust(w) for c, w in zip(columns, widths)))
+    for t in text:
+        print("  ".join(v.ljust(w) for v, w in zip(t, widths)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the pipeline run warehouse")
+    parser.add_argument("--db", default=WAREHOUSE_PATH, help=f"Warehouse file (default: {WAREHOUSE_PATH})")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("runs", help="Latest archived runs")
+    for name, text in (("best", "Best-ranked spread per run"), ("quotes", "Underlying quote per run")):
+        command = commands.add_parser(name, help=text)
+        command.add_argument("ticker")
+        command.add_argument("--days", type=float, help="Only the last N days")
+    contract = commands.add_parser("contract", help="One strike's quotes and Greeks per run")
+    contract.add_argument("ticker")
+    contract.add_argument("expiration", help="YYYY-MM-DD")
+    contract.add_argument("strike", type=float)
+    contract.add_argument("--side", choices=("C", "P"), help="Calls or puts only")
+    args = parser.parse_args()
+
+    warehouse = Warehouse(args.db)
+    since = None
+    if getattr(args, "days", None):
+        since = (datetime.now() - timedelta(days=args.days)).isoformat(timespec="seconds")
+
+    if args.command == "runs":
+        rows = warehouse.runs()
+    elif args.command == "best":
+        rows = warehouse.best_spreads(args.ticker.upper(), since)
+    elif args.command == "quotes":
+        rows = warehouse.quote_history(args.ticker.upper(), since)
+    else:
+        rows = warehouse.contract_history(args.ticker.upper(), args.expiration, args.strike, args.side)
+
+    print_rows(rows)
+    warehouse.close()
+
+
+if __name__ == "__main__":
+    main()